@@ -3,6 +3,7 @@
 This module contains the principal application
 """
 from models import storage
+from api.v1.json_provider import set_json_provider
 from api.v1.views import app_views
 from flask import Flask, make_response, jsonify
 from os import getenv
@@ -10,7 +11,7 @@ from flask_cors import CORS
 from flasgger import Swagger
 
 app = Flask(__name__)
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+set_json_provider(app)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/*": {"origins": "0.0.0.0"}})
 
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Contains the JSON providers the API can encode its responses with
+"""
+from os import getenv
+from flask.json.provider import DefaultJSONProvider
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encodes and decodes JSON with orjson, which is faster than the json
+    module and serializes datetimes itself"""
+
+    def dumps(self, obj, **kwargs):
+        """Returns obj serialized as a JSON string, indented if kwargs asks
+        for an indent; other json.dumps arguments are left to orjson"""
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        """Returns the value serialized in the string or bytes s"""
+        return orjson.loads(s)
+
+
+providers = {"json": DefaultJSONProvider}
+if orjson is not None:
+    providers["orjson"] = OrjsonProvider
+
+
+def set_json_provider(app):
+    """Makes app encode JSON with the provider HBNB_API_JSON names, json
+    (the default) or orjson, falling back to json if orjson is not
+    installed; responses are compact unless HBNB_API_PRETTY is 1, or when
+    it is not set, unless app runs in debug mode"""
+    app.json = providers.get(getenv("HBNB_API_JSON"),
+                             DefaultJSONProvider)(app)
+    pretty = getenv("HBNB_API_PRETTY")
+    if pretty is not None:
+        app.json.compact = pretty != "1"
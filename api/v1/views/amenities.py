@@ -2,7 +2,10 @@
 """
 This file contains the Amenity module
 """
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.amenity import Amenity
@@ -13,8 +16,8 @@ from flasgger.utils import swag_from
 @swag_from('documentation/amenity/get.yml', methods=['GET'])
 def get_all_amenities():
     """Retrieve all amenities"""
-    amenities = [obj.to_dict() for obj in storage.all(Amenity).values()]
-    return jsonify(amenities)
+    return paginate(partial(storage.page, Amenity),
+                    version=partial(storage.collection_version, Amenity))
 
 
 @app_views.route('/amenities/<string:amenity_id>', methods=['GET'],
@@ -22,10 +25,7 @@ def get_all_amenities():
 @swag_from('documentation/amenity/get_id.yml', methods=['GET'])
 def get_amenity(amenity_id):
     """Retrieve a specific amenity by id"""
-    amenity = storage.get(Amenity, amenity_id)
-    if amenity is None:
-        abort(404)
-    return jsonify(amenity.to_dict())
+    return get_object(Amenity, amenity_id)
 
 
 @app_views.route('/amenities/<string:amenity_id>', methods=['DELETE'],
@@ -70,5 +70,5 @@ def update_amenity(amenity_id):
     for key, value in data.items():
         if key not in ['id', 'created_at', 'updated_at']:
             setattr(amenity, key, value)
-    storage.save()
+    amenity.save()
     return jsonify(amenity.to_dict())
@@ -2,7 +2,10 @@
 """
 This file contains the City module
 """
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.state import State
@@ -13,20 +16,18 @@ from flasgger.utils import swag_from
 @swag_from('documentation/city/get.yml', methods=['GET'])
 def get_cities(state_id):
     """Get cities for a given state ID"""
-    state = storage.get(State, state_id)
-    if not state:
+    if storage.version(State, state_id) is None:
         abort(404)
-    cities = [city.to_dict() for city in state.cities]
-    return jsonify(cities)
+    return paginate(partial(storage.page, City, attr='state_id',
+                            parent_id=state_id),
+                    version=partial(storage.collection_version, City,
+                                    attr='state_id', parent_id=state_id))
 
 @app_views.route('/cities/<string:city_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/city/get_id.yml', methods=['GET'])
 def get_city(city_id):
     """Get a city by ID"""
-    city = storage.get(City, city_id)
-    if not city:
-        abort(404)
-    return jsonify(city.to_dict())
+    return get_object(City, city_id)
 
 @app_views.route('/cities/<string:city_id>', methods=['DELETE'], strict_slashes=False)
 @swag_from('documentation/city/delete.yml', methods=['DELETE'])
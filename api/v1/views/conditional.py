@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Contains the helpers that answer conditional GET requests
+"""
+from datetime import timezone
+import hashlib
+import json
+from flask import abort, current_app, jsonify, make_response, request
+from models import storage
+
+
+def etag(*parts):
+    """Returns the strong entity tag of the representation parts identify,
+    encoded the way current_app encodes JSON"""
+    parts += (type(current_app.json).__name__, current_app.json.compact,
+              current_app.debug)
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def conditional(parts, last_modified, build):
+    """Returns the response build() makes, with the ETag of parts and, if
+    it is not None, the Last-Modified time last_modified; or, without
+    calling build, 304 Not Modified if the If-None-Match or, without it,
+    the If-Modified-Since header of the request shows the client has it"""
+    tag = etag(*parts)
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc,
+                                              microsecond=0)
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(tag)
+    else:
+        fresh = last_modified is not None and \
+            request.if_modified_since is not None and \
+            last_modified <= request.if_modified_since
+    response = make_response("", 304) if fresh else build()
+    response.set_etag(tag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def get_object(cls, id):
+    """Returns the response holding the object of cls with that id, or 404
+    if there is none, answering conditional requests from the updated_at
+    storage reports, so the object is only loaded when it is sent"""
+    updated_at = storage.version(cls, id)
+    if updated_at is None:
+        abort(404)
+
+    def build():
+        """Returns the response holding the object"""
+        obj = storage.get(cls, id)
+        if obj is None:
+            abort(404)
+        return jsonify(obj.to_dict())
+    return conditional((cls.__name__, id, updated_at), updated_at, build)
@@ -2,10 +2,11 @@
 """
 This module contains endpoint(route) status
 """
-from models import storage
-from flask import Flask, jsonify
+from models import storage, storage_t
+from flask import Flask, abort, jsonify
 from api.v1.views import app_views
 
+
 @app_views.route('/status', strict_slashes=False)
 def status():
     """
@@ -13,16 +14,38 @@ def status():
     """
     return jsonify({"status": "OK"})
 
+
 @app_views.route('/stats', strict_slashes=False)
 def count():
     """
     Retrieves the number of each objects by type
     """
+    stats = storage.stats()
     return jsonify({
-        "amenities": storage.count("Amenity"),
-        "cities": storage.count("City"),
-        "places": storage.count("Place"),
-        "reviews": storage.count("Review"),
-        "states": storage.count("State"),
-        "users": storage.count("User")
+        "amenities": stats["Amenity"],
+        "cities": stats["City"],
+        "places": stats["Place"],
+        "reviews": stats["Review"],
+        "states": stats["State"],
+        "users": stats["User"]
     })
+
+
+@app_views.route('/pool', strict_slashes=False)
+def pool():
+    """
+    Retrieves the state of the database connection pool
+    """
+    if storage_t != "db":
+        abort(404)
+    return jsonify(storage.pool_status())
+
+
+@app_views.route('/cache', strict_slashes=False)
+def cache():
+    """
+    Retrieves the hits, misses and size of the object cache
+    """
+    if not hasattr(storage, "cache_stats"):
+        abort(404)
+    return jsonify(storage.cache_stats())
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""
+Contains the helper every list endpoint pages its results with
+"""
+import base64
+import binascii
+from datetime import datetime
+import json
+import textwrap
+from urllib.parse import urlencode
+from flask import Response, current_app, jsonify, make_response, request, \
+    stream_with_context
+from api.v1.views.conditional import conditional
+from models.base_model import TIME_FORMAT
+
+
+def position(obj):
+    """Returns the (created_at, id) pair of obj, which pages start past"""
+    return obj.created_at.strftime(TIME_FORMAT), obj.id
+
+
+def encode_cursor(obj):
+    """Returns the cursor of the page that starts after obj"""
+    after = list(position(obj))
+    return base64.urlsafe_b64encode(json.dumps(after).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns the (created_at, id) pair cursor holds, or raises
+    ValueError if it is not a cursor encode_cursor made"""
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError):
+        raise ValueError(cursor)
+    if not isinstance(after, list) or len(after) != 2 or \
+            not all(isinstance(part, str) for part in after):
+        raise ValueError(cursor)
+    datetime.strptime(after[0], TIME_FORMAT)
+    return tuple(after)
+
+
+def page_of(objs):
+    """Returns a fetch function for paginate() paging the list objs, for
+    the lists storage cannot page itself"""
+    def fetch(limit=None, after=None, columns=None):
+        """Returns up to limit objects of objs starting past after"""
+        ordered = sorted((position(obj), obj) for obj in objs)
+        return [obj for pair, obj in ordered
+                if after is None or pair > after][:limit]
+    return fetch
+
+
+def version_of(objs):
+    """Returns a version function for paginate() of the list objs: its
+    ids and their latest updated_at"""
+    def version():
+        """Returns the ids of objs and their latest updated_at"""
+        return (sorted(obj.id for obj in objs),
+                max((obj.updated_at for obj in objs), default=None))
+    return version
+
+
+def iter_chunks(fetch, after=None, columns=None, chunk_size=1000):
+    """Yields the lists of up to chunk_size objects fetch(limit, after,
+    columns) returns one after the other until every object past after
+    was reached, so only one of them is held at a time"""
+    while True:
+        objs = fetch(limit=chunk_size, after=after, columns=columns)
+        if objs:
+            yield objs
+        if len(objs) < chunk_size:
+            return
+        after = position(objs[-1])
+
+
+def dump_args():
+    """Returns the arguments the JSON provider of current_app dumps
+    responses with, as its response() does: indented unless compact, and
+    compact unless it is not set and the app runs in debug mode"""
+    compact = current_app.json.compact
+    if compact is False or compact is None and current_app.debug:
+        return {"indent": 2}
+    return {"separators": (",", ":")}
+
+
+def paginate(fetch, drop=(), version=None):
+    """Returns the response listing the objects fetch(limit, after,
+    columns) returns in (created_at, id) order, without their keys in drop;
+    with version, a function returning what identifies the listed objects,
+    such as their number, and their latest updated_at, conditional
+    requests are answered without fetching them
+
+    The query string can hold limit, the most objects to list, cursor,
+    where to start as given by the Link header of the previous page, and
+    fields, the comma separated keys to keep; without limit, every object
+    is listed, streamed a chunk of objects at a time"""
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return make_response(jsonify({"error": "Invalid limit"}), 400)
+    after = request.args.get("cursor")
+    if after is not None:
+        try:
+            after = decode_cursor(after)
+        except ValueError:
+            return make_response(jsonify({"error": "Invalid cursor"}), 400)
+    fields = request.args.get("fields")
+    if fields is not None:
+        fields = [field for field in fields.split(",") if field]
+    if version is not None:
+        return conditional((request.full_path,) + tuple(version()), None,
+                           lambda: respond(fetch, drop, limit, after, fields))
+    return respond(fetch, drop, limit, after, fields)
+
+
+def respond(fetch, drop, limit, after, fields):
+    """Returns the response paginate() lists the objects with, once it
+    checked the query string"""
+
+    def to_dict(obj):
+        """Returns the dictionary of obj to list"""
+        obj_dict = obj.to_dict()
+        for key in drop:
+            obj_dict.pop(key, None)
+        if fields is not None:
+            obj_dict = {key: obj_dict[key] for key in fields
+                        if key in obj_dict}
+        return obj_dict
+
+    if limit is None:
+        args = dump_args()
+        indent = " " * args.get("indent", 0)
+        newline = "\n" if indent else ""
+
+        def generate():
+            """Yields the JSON list of the objects a chunk at a time, laid
+            out as jsonify would lay out the whole list"""
+            sep = "[" + newline
+            for objs in iter_chunks(fetch, after, fields):
+                yield sep + ("," + newline).join(textwrap.indent(
+                    current_app.json.dumps(to_dict(obj), **args), indent)
+                    for obj in objs)
+                sep = "," + newline
+            yield "[]\n" if sep == "[" + newline else newline + "]\n"
+        return Response(stream_with_context(generate()),
+                        mimetype=current_app.json.mimetype)
+    objs = fetch(limit=limit + 1, after=after, columns=fields)
+    next_page = len(objs) > limit
+    if next_page:
+        objs = objs[:limit]
+    response = jsonify([to_dict(obj) for obj in objs])
+    if next_page:
+        args = request.args.to_dict(flat=False)
+        args["cursor"] = [encode_cursor(objs[-1])]
+        response.headers["Link"] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args, doseq=True))
+    return response
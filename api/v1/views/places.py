@@ -2,35 +2,41 @@
 """
 This file contains the Place module
 """
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.place import Place
 from models.city import City
 from models.user import User
-from models.amenity import Amenity
-from models.state import State
 from flasgger.utils import swag_from
 
-@app_views.route('/cities/<string:city_id>/places', methods=['GET'], strict_slashes=False)
+
+@app_views.route('/cities/<string:city_id>/places', methods=['GET'],
+                 strict_slashes=False)
 @swag_from('documentation/places/get.yml', methods=['GET'])
 def get_all_places(city_id):
     """List all places in a specific city by its ID."""
-    city = storage.get(City, city_id)
-    if city is None:
+    if storage.version(City, city_id) is None:
         abort(404)
-    return jsonify([place.to_dict() for place in city.places])
+    return paginate(partial(storage.page, Place, attr='city_id',
+                            parent_id=city_id),
+                    version=partial(storage.collection_version, Place,
+                                    attr='city_id', parent_id=city_id))
+
 
-@app_views.route('/places/<string:place_id>', methods=['GET'], strict_slashes=False)
+@app_views.route('/places/<string:place_id>', methods=['GET'],
+                 strict_slashes=False)
 @swag_from('documentation/places/get_id.yml', methods=['GET'])
 def get_place(place_id):
     """Get a specific place by its ID."""
-    place = storage.get(Place, place_id)
-    if place is None:
-        abort(404)
-    return jsonify(place.to_dict())
+    return get_object(Place, place_id)
 
-@app_views.route('/places/<string:place_id>', methods=['DELETE'], strict_slashes=False)
+
+@app_views.route('/places/<string:place_id>', methods=['DELETE'],
+                 strict_slashes=False)
 @swag_from('documentation/places/delete.yml', methods=['DELETE'])
 def delete_place(place_id):
     """Delete a specific place by its ID."""
@@ -41,7 +47,9 @@ def delete_place(place_id):
     storage.save()
     return jsonify({})
 
-@app_views.route('/cities/<string:city_id>/places', methods=['POST'], strict_slashes=False)
+
+@app_views.route('/cities/<string:city_id>/places', methods=['POST'],
+                 strict_slashes=False)
 @swag_from('documentation/places/post.yml', methods=['POST'])
 def create_place(city_id):
     """Create a new place instance in a specific city."""
@@ -63,7 +71,9 @@ def create_place(city_id):
     place.save()
     return jsonify(place.to_dict()), 201
 
-@app_views.route('/places/<string:place_id>', methods=['PUT'], strict_slashes=False)
+
+@app_views.route('/places/<string:place_id>', methods=['PUT'],
+                 strict_slashes=False)
 @swag_from('documentation/places/put.yml', methods=['PUT'])
 def update_place(place_id):
     """Update a place by its ID."""
@@ -76,9 +86,85 @@ def update_place(place_id):
     for key, value in json_data.items():
         if key not in ['id', 'user_id', 'city_id', 'created_at', 'updated']:
             setattr(place, key, value)
-    storage.save()
+    place.save()
     return jsonify(place.to_dict())
 
+
+def get_batch():
+    """Returns the JSON list of objects of the request, or None if it is
+    not one"""
+    json_data = request.get_json(silent=True)
+    if not isinstance(json_data, list) or \
+            not all(isinstance(data, dict) for data in json_data):
+        return None
+    return json_data
+
+
+def missing(json_data, keys):
+    """Returns the 400 response naming the first key of keys one of the
+    objects of json_data lacks, and its index, or None"""
+    for index, data in enumerate(json_data):
+        for key in keys:
+            if not isinstance(data.get(key), str):
+                return make_response(jsonify({"error": "Missing " + key,
+                                              "index": index}), 400)
+    return None
+
+
+@app_views.route('/places/batch', methods=['POST'], strict_slashes=False)
+@swag_from('documentation/places/batch_post.yml', methods=['POST'])
+def create_places():
+    """Create the places of a JSON list, saved all at once."""
+    json_data = get_batch()
+    if json_data is None:
+        return make_response(jsonify({"error": "Not a JSON list"}), 400)
+    error = missing(json_data, ('city_id', 'user_id', 'name'))
+    if error is not None:
+        return error
+    for cls, key in ((City, 'city_id'), (User, 'user_id')):
+        ids = {data[key] for data in json_data}
+        if len(storage.bulk_get(cls, ids)) != len(ids):
+            abort(404)
+    places = [Place(**data) for data in json_data]
+    storage.bulk_new(places)
+    return jsonify([place.to_dict() for place in places]), 201
+
+
+@app_views.route('/places/batch', methods=['PUT'], strict_slashes=False)
+@swag_from('documentation/places/batch_put.yml', methods=['PUT'])
+def update_places():
+    """Update the places of a JSON list by their IDs, saved all at once."""
+    json_data = get_batch()
+    if json_data is None:
+        return make_response(jsonify({"error": "Not a JSON list"}), 400)
+    error = missing(json_data, ('id',))
+    if error is not None:
+        return error
+    ids = {data['id'] for data in json_data}
+    if len(storage.bulk_get(Place, ids)) != len(ids):
+        abort(404)
+    rows = [{key: value for key, value in data.items()
+             if key not in ['user_id', 'city_id', 'created_at', 'updated_at']}
+            for data in json_data]
+    places = storage.bulk_update(Place, rows)
+    return jsonify([place.to_dict() for place in places])
+
+
+@app_views.route('/places/batch', methods=['DELETE'], strict_slashes=False)
+@swag_from('documentation/places/batch_delete.yml', methods=['DELETE'])
+def delete_places():
+    """Delete the places of a JSON list of IDs all at once."""
+    json_data = request.get_json(silent=True)
+    if not isinstance(json_data, list) or \
+            not all(isinstance(id, str) for id in json_data):
+        return make_response(jsonify({"error": "Not a JSON list"}), 400)
+    places = storage.bulk_get(Place, json_data)
+    if len(places) != len(set(json_data)):
+        abort(404)
+    storage.bulk_delete(places.values())
+    return jsonify({})
+
+
 @app_views.route('/places_search', methods=['POST'], strict_slashes=False)
 @swag_from('documentation/places/search.yml', methods=['POST'])
 def search_places():
@@ -87,41 +173,9 @@ def search_places():
     if json_data is None:
         return make_response(jsonify({"error": "Not a JSON"}), 400)
 
-    states = json_data.get('states', [])
-    cities = json_data.get('cities', [])
-    amenities = json_data.get('amenities', [])
-
-    if not states and not cities and not amenities:
-        places = [place.to_dict() for place in storage.all(Place).values()]
-        return jsonify(places)
-
-    filtered_places = []
-
-    if states:
-        for state_id in states:
-            state = storage.get(State, state_id)
-            if state:
-                for city in state.cities:
-                    if city:
-                        filtered_places.extend(city.places)
-
-    if cities:
-        for city_id in cities:
-            city = storage.get(City, city_id)
-            if city:
-                for place in city.places:
-                    if place not in filtered_places:
-                        filtered_places.append(place)
-
-    if amenities:
-        if not filtered_places:
-            filtered_places = storage.all(Place).values()
-        amenities_objects = [storage.get(Amenity, a_id) for a_id in amenities]
-        filtered_places = [place for place in filtered_places
-                           if all(amenity in place.amenities for amenity in amenities_objects)]
-
-    result = [place.to_dict() for place in filtered_places]
-    for place in result:
-        place.pop('amenities', None)
-
-    return jsonify(result)
+    ids = {}
+    for name in ('states', 'cities', 'amenities'):
+        ids[name] = [id for id in json_data.get(name) or []
+                     if isinstance(id, str)]
+    return paginate(partial(storage.search_places, **ids),
+                    drop=('amenities',))
@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """places_amenities.py"""
 from api.v1.views import app_views
+from api.v1.views.pagination import paginate, page_of, version_of
 from flask import abort, jsonify, make_response, request
-from models import storage
+from models import storage, storage_t
 from models.amenity import Amenity
 from models.place import Place
 from flasgger.utils import swag_from
@@ -14,12 +15,12 @@ def get_amenities(place_id):
     place = storage.get(Place, place_id)
     if place is None:
         abort(404)
-    amenities = [amenity.to_dict() for amenity in place.amenities]
-    return jsonify(amenities)
+    amenities = place.amenities
+    return paginate(page_of(amenities), version=version_of(amenities))
 
 @app_views.route('/places/<string:place_id>/amenities/<string:amenity_id>', methods=['DELETE'], strict_slashes=False)
 @swag_from('documentation/place_amenity/delete.yml', methods=['DELETE'])
-def delete_amenity(place_id, amenity_id):
+def delete_place_amenity(place_id, amenity_id):
     """Remove an amenity from a place"""
     place = storage.get(Place, place_id)
     if place is None:
@@ -29,8 +30,14 @@ def delete_amenity(place_id, amenity_id):
         abort(404)
     if amenity not in place.amenities:
         abort(404)
-    place.amenities.remove(amenity)
-    storage.save()
+    if storage_t == 'db':
+        place.amenities.remove(amenity)
+    else:
+        # place.amenities is built anew on each access; a new list of ids
+        # also re-indexes the place under its amenities
+        place.amenity_ids = [id for id in place.amenity_ids
+                             if id != amenity.id]
+    place.save()
     return jsonify({})
 
 @app_views.route('/places/<string:place_id>/amenities/<string:amenity_id>', methods=['POST'], strict_slashes=False)
@@ -45,6 +52,9 @@ def add_amenity(place_id, amenity_id):
         abort(404)
     if amenity in place.amenities:
         return jsonify(amenity.to_dict()), 200
-    place.amenities.append(amenity)
-    storage.save()
+    if storage_t == 'db':
+        place.amenities.append(amenity)
+    else:
+        place.amenities = amenity
+    place.save()
     return jsonify(amenity.to_dict()), 201
@@ -2,7 +2,10 @@
 """
 This file contains the Review module
 """
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.place import Place
@@ -14,20 +17,18 @@ from flasgger.utils import swag_from
 @swag_from('documentation/reviews/get.yml', methods=['GET'])
 def get_all_reviews(place_id):
     """Retrieve all reviews for a specific place"""
-    place = storage.get(Place, place_id)
-    if place is None:
+    if storage.version(Place, place_id) is None:
         abort(404)
-    reviews = [review.to_dict() for review in place.reviews]
-    return jsonify(reviews)
+    return paginate(partial(storage.page, Review, attr='place_id',
+                            parent_id=place_id),
+                    version=partial(storage.collection_version, Review,
+                                    attr='place_id', parent_id=place_id))
 
 @app_views.route('/reviews/<string:review_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/reviews/get_id.yml', methods=['GET'])
 def get_review(review_id):
     """Retrieve a review by ID"""
-    review = storage.get(Review, review_id)
-    if review is None:
-        abort(404)
-    return jsonify(review.to_dict())
+    return get_object(Review, review_id)
 
 @app_views.route('/reviews/<string:review_id>', methods=['DELETE'], strict_slashes=False)
 @swag_from('documentation/reviews/delete.yml', methods=['DELETE'])
@@ -75,5 +76,5 @@ def update_review(review_id):
     for key, value in data.items():
         if key not in ['id', 'user_id', 'place_id', 'created_at', 'updated_at']:
             setattr(review, key, value)
-    storage.save()
+    review.save()
     return jsonify(review.to_dict())
@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 """State module"""
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.state import State
@@ -10,17 +13,14 @@ from flasgger.utils import swag_from
 @swag_from('documentation/state/get.yml', methods=['GET'])
 def get_all_states():
     """Retrieve all states"""
-    states = [state.to_dict() for state in storage.all(State).values()]
-    return jsonify(states)
+    return paginate(partial(storage.page, State),
+                    version=partial(storage.collection_version, State))
 
 @app_views.route('/states/<string:state_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/state/get_id.yml', methods=['GET'])
 def get_state_by_id(state_id):
     """Retrieve a state by ID"""
-    state = storage.get(State, state_id)
-    if not state:
-        abort(404)
-    return jsonify(state.to_dict())
+    return get_object(State, state_id)
 
 @app_views.route('/states/<string:state_id>', methods=['DELETE'], strict_slashes=False)
 @swag_from('documentation/state/delete.yml', methods=['DELETE'])
@@ -2,7 +2,10 @@
 """
 This file contains the User module
 """
+from functools import partial
 from api.v1.views import app_views
+from api.v1.views.conditional import get_object
+from api.v1.views.pagination import paginate
 from flask import jsonify, abort, request, make_response
 from models import storage
 from models.user import User
@@ -12,17 +15,14 @@ from flasgger.utils import swag_from
 @swag_from('documentation/user/get.yml', methods=['GET'])
 def get_all_users():
     """Get all users"""
-    users = [user.to_dict() for user in storage.all(User).values()]
-    return jsonify(users)
+    return paginate(partial(storage.page, User),
+                    version=partial(storage.collection_version, User))
 
 @app_views.route('/users/<string:user_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/user/get_id.yml', methods=['GET'])
 def get_user(user_id):
     """Get user by ID"""
-    user = storage.get(User, user_id)
-    if user is None:
-        abort(404)
-    return jsonify(user.to_dict())
+    return get_object(User, user_id)
 
 @app_views.route('/users/<string:user_id>', methods=['DELETE'], strict_slashes=False)
 @swag_from('documentation/user/delete.yml', methods=['DELETE'])
@@ -63,5 +63,5 @@ def update_user(user_id):
     for key, value in data.items():
         if key not in ['id', 'email', 'created_at', 'updated_at']:
             setattr(user, key, value)
-    storage.save()
+    user.save()
     return jsonify(user.to_dict())
@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Reports the time FileStorage.all(cls) and count(cls) take to find a few
+objects of one class among many, next to scanning every object of all()
+for them as all(cls) used to
+
+Usage: ./benchmarks/all_cls.py [number of objects]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    os.chdir(tempfile.mkdtemp())
+    from models.amenity import Amenity
+    from models.base_model import BaseModel
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage()
+    for i in range(count):
+        obj = BaseModel.__new__(BaseModel)
+        obj.__dict__["id"] = str(i)
+        storage.new(obj)
+    for i in range(50):
+        storage.new(Amenity())
+    objects = storage.all()
+
+    start = time.perf_counter()
+    scanned = {key: obj for key, obj in objects.items()
+               if isinstance(obj, Amenity)}
+    scan_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = storage.all(Amenity)
+    storage.count(Amenity)
+    index_time = time.perf_counter() - start
+    assert indexed == scanned
+    print("{} objects, {} amenities".format(count, len(indexed)))
+    print("{:<10} {:10.3f} ms".format("scan", scan_time * 1000))
+    print("{:<10} {:10.3f} ms".format("index", index_time * 1000))
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Reports the places per second imported one request and one save at a time
+through POST /api/v1/cities/<city_id>/places, and a batch of places per
+request and per save through POST /api/v1/places/batch, then updated
+through PUT /api/v1/places/batch
+
+Runs on a FileStorage of its own in a temporary directory.
+
+Usage: ./benchmarks/bulk.py [number of places] [places per batch]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def measure(name, count, send):
+    """Prints how many places per second send() imports, count of them"""
+    start = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - start
+    print("{:<28} {:8} places {:10.0f} places/s".format(
+        name, count, count / elapsed))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from api.v1.app import app
+    from models.city import City
+    from models.state import State
+    from models.user import User
+    state = State(name="Benchmark")
+    city = City(name="Benchmark", state_id=state.id)
+    user = User(email="benchmark@hbnb.io", password="benchmark")
+    for obj in (state, city, user):
+        models.storage.new(obj)
+    models.storage.save()
+    client = app.test_client()
+
+    def place(i):
+        """Returns the dictionary of the i-th place to import"""
+        return {"city_id": city.id, "user_id": user.id,
+                "name": "Place {}".format(i), "number_rooms": 3,
+                "description": "A nice place to stay " * 4}
+
+    def one_at_a_time():
+        """Imports the places with one request each"""
+        for i in range(min(count, 2000)):
+            client.post("/api/v1/cities/{}/places".format(city.id),
+                        json=place(i))
+
+    ids = []
+
+    def batches():
+        """Imports the places with one request per batch"""
+        for start in range(0, count, batch):
+            ids.extend(obj["id"] for obj in client.post(
+                "/api/v1/places/batch", json=[
+                    place(i) for i in range(start, min(start + batch, count))
+                ]).get_json())
+
+    def update_batches():
+        """Renames the places with one request per batch"""
+        for start in range(0, count, batch):
+            client.put("/api/v1/places/batch", json=[
+                {"id": id, "name": "Renamed"}
+                for id in ids[start:start + batch]])
+
+    measure("one request, one save", min(count, 2000), one_at_a_time)
+    measure("batch of {}".format(batch), count, batches)
+    measure("batch update of {}".format(batch), count, update_batches)
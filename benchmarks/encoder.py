@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Reports the bytes and milliseconds per response of the list endpoints
+GET /api/v1/places?limit=1000, paged and encoded at once, and
+GET /api/v1/places, streamed, for each JSON provider of the API, indented
+as the API used to answer and compact as it does now, then the time the
+provider alone takes to encode those 1000 places
+
+Runs on a FileStorage of its own in a temporary directory.
+
+Usage: ./benchmarks/encoder.py [number of places]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def measure(name, client, url, repeat):
+    """Prints the size of the response to url and the mean time it takes"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        size = len(client.get(url).data)
+    elapsed = (time.perf_counter() - start) / repeat
+    print("{:<22} {:<28} {:10} bytes {:8.1f} ms".format(
+        name, url.split("/")[-1], size, elapsed * 1000))
+
+
+def measure_encoding(name, app, dicts, repeat):
+    """Prints the size of the JSON response of dicts and the mean time the
+    provider of app takes to build it"""
+    with app.app_context():
+        start = time.perf_counter()
+        for i in range(repeat):
+            size = len(app.json.response(dicts).data)
+        elapsed = (time.perf_counter() - start) / repeat
+    print("{:<22} {:<28} {:10} bytes {:8.1f} ms".format(
+        name, "encoding only", size, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from api.v1.app import app
+    from api.v1.json_provider import providers, set_json_provider
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    state = State(name="Benchmark")
+    city = City(name="Benchmark", state_id=state.id)
+    user = User(email="benchmark@hbnb.io", password="benchmark")
+    for obj in [state, city, user] + [
+            Place(city_id=city.id, user_id=user.id, name="Place {}".format(i),
+                  description="A nice place to stay " * 4, number_rooms=3,
+                  latitude=37.77, longitude=-122.43) for i in range(count)]:
+        models.storage.new(obj)
+    models.storage.save()
+    client = app.test_client()
+    dicts = [place.to_dict() for place in
+             models.storage.page(Place, 1000, attr="city_id",
+                                 parent_id=city.id)]
+    print("{} places".format(count))
+    for provider in providers:
+        for pretty in ("1", "0"):
+            os.environ["HBNB_API_JSON"] = provider
+            os.environ["HBNB_API_PRETTY"] = pretty
+            set_json_provider(app)
+            name = provider + (" indented" if pretty == "1" else " compact")
+            for url in ("places?limit=1000", "places"):
+                measure(name, client, "/api/v1/cities/{}/{}".format(
+                    city.id, url), 5)
+            measure_encoding(name, app, dicts, 50)
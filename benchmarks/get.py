@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Reports the time DBStorage.get() takes to fetch one place among many,
+next to finding it in a dictionary of the whole table as get() used to
+
+Needs HBNB_TYPE_STORAGE=db and the HBNB_MYSQL_* variables of a database
+the places can be added to; they are deleted at the end.
+
+Usage: ./benchmarks/get.py [number of places]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def table_lookup(session, cls, id):
+    """Finds the object the way get() used to: by loading every row"""
+    objs = {obj.__class__.__name__ + "." + obj.id: obj
+            for obj in session.query(cls).all()}
+    return objs.get(cls.__name__ + "." + id)
+
+
+def measure(name, lookup, ids, session):
+    """Prints the mean time lookup takes per id, each in a new session"""
+    start = time.perf_counter()
+    for id in ids:
+        session.expunge_all()
+        lookup(id)
+    elapsed = (time.perf_counter() - start) / len(ids)
+    print("{:<14} {:10.3f} ms per request".format(name, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    import models
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    if models.storage_t != "db":
+        sys.exit("set HBNB_TYPE_STORAGE=db")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    storage = models.storage
+    session = storage._DBStorage__session
+    state = State(name="Benchmark")
+    city = City(name="Benchmark", state_id=state.id)
+    user = User(email="benchmark@hbnb.io", password="benchmark")
+    for obj in (state, city, user):
+        storage.new(obj)
+    storage.save()
+    ids = []
+    for i in range(0, count, 10000):
+        places = [Place(city_id=city.id, user_id=user.id,
+                        name="Place {}".format(j))
+                  for j in range(i, min(i + 10000, count))]
+        ids.extend(place.id for place in places)
+        session.add_all(places)
+        session.commit()
+        session.expunge_all()
+    try:
+        print("{} places".format(count))
+        sample = random.sample(ids, 5)
+        measure("all(cls).get", lambda id: table_lookup(session, Place, id),
+                sample, session)
+        sample = random.sample(ids, min(1000, count))
+        measure("get", lambda id: storage.get(Place, id), sample, session)
+    finally:
+        session.query(Place).filter(Place.city_id == city.id).delete()
+        session.query(City).filter(City.id == city.id).delete()
+        session.query(State).filter(State.id == state.id).delete()
+        session.query(User).filter(User.id == user.id).delete()
+        session.commit()
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Reports the time and peak memory FileStorage.reload() needs for a large
+JSON file, eagerly and with lazy loading, next to loading the same file
+in one piece with json.load
+
+Usage: ./benchmarks/reload.py [number of objects]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process in MiB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate(path, count):
+    """Writes a file.json holding count places"""
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(count):
+            key = "Place.{:032x}".format(i)
+            record = {"id": key[6:], "__class__": "Place",
+                      "created_at": "2017-03-25T02:17:06.000000",
+                      "updated_at": "2017-03-25T02:17:06.000000",
+                      "city_id": "{:032x}".format(i % 1000),
+                      "user_id": "{:032x}".format(i % 5000),
+                      "name": "Place {}".format(i),
+                      "description": "A nice place to stay " * 4,
+                      "number_rooms": 3, "number_bathrooms": 1,
+                      "max_guest": 6, "price_by_night": 120,
+                      "latitude": 37.77, "longitude": -122.43}
+            f.write("{}{}: {}".format(", " if i else "", json.dumps(key),
+                                      json.dumps(record)))
+        f.write("}")
+
+
+def measure(mode, path):
+    """Loads path the way mode says and prints seconds and peak RSS"""
+    from models.engine.file_storage import FileStorage
+    baseline = peak_rss()
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(path) as f:
+            json.load(f)
+    else:
+        FileStorage._FileStorage__file_path = path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = mode == "lazy"
+        FileStorage().reload()
+    elapsed = time.perf_counter() - start
+    print("{:<10} {:8.2f} s {:10.1f} MiB peak ({:+.1f} MiB)".format(
+        mode, elapsed, peak_rss(), peak_rss() - baseline))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2])
+        sys.exit(0)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "file.json")
+        generate(path, count)
+        print("{} objects, {:.1f} MiB file".format(
+            count, os.path.getsize(path) / 2 ** 20))
+        for mode in ("json.load", "reload", "lazy"):
+            subprocess.run([sys.executable, __file__, mode, path],
+                           check=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Reports the time and peak memory GET /api/v1/cities/<city_id>/places
+takes to list every place of a large city, streamed as the API does now,
+next to building the whole list and jsonify-ing it as it used to
+
+Needs HBNB_TYPE_STORAGE=db and the HBNB_MYSQL_* variables of a database
+the places can be added to; they are deleted at the end.
+
+Usage: ./benchmarks/stream.py [number of places]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def measure(name, request):
+    """Prints the time and peak memory request() takes to build and read
+    the whole response body"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in request())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    print("{:<8} {:8.2f} s {:10.1f} MiB peak for {:.1f} MiB of JSON".format(
+        name, elapsed, peak, size / 2 ** 20))
+
+
+if __name__ == "__main__":
+    import models
+    from api.v1.app import app
+    from flask import jsonify
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    if models.storage_t != "db":
+        sys.exit("set HBNB_TYPE_STORAGE=db")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    storage = models.storage
+    session = storage._DBStorage__session
+    state = State(name="Benchmark")
+    city = City(name="Benchmark", state_id=state.id)
+    user = User(email="benchmark@hbnb.io", password="benchmark")
+    for obj in (state, city, user):
+        storage.new(obj)
+    storage.save()
+    for i in range(0, count, 10000):
+        session.add_all([Place(city_id=city.id, user_id=user.id,
+                               name="Place {}".format(j))
+                         for j in range(i, min(i + 10000, count))])
+        session.commit()
+        session.expunge_all()
+    client = app.test_client()
+    url = "/api/v1/cities/{}/places".format(city.id)
+
+    def listed():
+        """Builds the response the way the endpoint used to"""
+        with app.app_context():
+            places = storage.get(City, city.id).places
+            yield jsonify([place.to_dict() for place in places]).data
+            del places
+
+    def streamed():
+        """Reads the streamed response a chunk at a time"""
+        response = client.get(url, buffered=False)
+        yield from response.response
+        response.close()
+    try:
+        print("{} places".format(count))
+        session.expunge_all()
+        measure("jsonify", listed)
+        session.expunge_all()
+        measure("stream", streamed)
+    finally:
+        session = storage._DBStorage__session
+        session.query(Place).filter(Place.city_id == city.id).delete()
+        session.query(City).filter(City.id == city.id).delete()
+        session.query(State).filter(State.id == state.id).delete()
+        session.query(User).filter(User.id == user.id).delete()
+        session.commit()
@@ -15,3 +15,15 @@ else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
 storage.reload()
+
+if getenv("HBNB_CACHE_SIZE") or getenv("HBNB_CACHE_BYTES"):
+    from models.engine.cached_storage import CachedStorage
+    # other processes write the same database unseen, so what they changed
+    # is only served stale until entries expire; FileStorage reloads the
+    # objects cached entries stand for
+    ttl = float(getenv("HBNB_CACHE_TTL")) if getenv("HBNB_CACHE_TTL") else \
+        5.0 if storage_t == "db" else None
+    storage = CachedStorage(
+        storage, int(getenv("HBNB_CACHE_SIZE") or 1024),
+        int(getenv("HBNB_CACHE_BYTES")) if getenv("HBNB_CACHE_BYTES") else
+        None, ttl)
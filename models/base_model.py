@@ -8,19 +8,25 @@ import models
 import uuid
 from os import getenv
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 
 TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 
 Base = declarative_base() if models.storage_t == "db" else object
 
+# MySQL's DATETIME drops the microseconds, which updates in the same
+# second, entity tags and page cursors need
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
 class BaseModel:
     """The BaseModel class from which future classes will be derived"""
 
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(Timestamp, default=datetime.utcnow, index=True)
+        updated_at = Column(Timestamp, default=datetime.utcnow, index=True)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -28,12 +34,14 @@ class BaseModel:
             for key, value in kwargs.items():
                 if key != "__class__":
                     setattr(self, key, value)
-            if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], TIME_FORMAT)
+            if kwargs.get("created_at", None) and \
+                    type(self.created_at) is str:
+                self.created_at = datetime.fromisoformat(kwargs["created_at"])
             else:
                 self.created_at = datetime.utcnow()
-            if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], TIME_FORMAT)
+            if kwargs.get("updated_at", None) and \
+                    type(self.updated_at) is str:
+                self.updated_at = datetime.fromisoformat(kwargs["updated_at"])
             else:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
@@ -43,9 +51,42 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """Rebuilds an instance from a to_dict() dictionary without the
+        per-attribute work __setattr__ does"""
+        obj = cls.__new__(cls)
+        for key, value in obj_dict.items():
+            if key in ("created_at", "updated_at") and type(value) is str:
+                value = datetime.fromisoformat(value)
+            if key != "__class__":
+                object.__setattr__(obj, key, value)
+        for key in ("created_at", "updated_at"):
+            if key not in obj_dict:
+                object.__setattr__(obj, key, datetime.utcnow())
+        if obj_dict.get("id") is None:
+            object.__setattr__(obj, "id", str(uuid.uuid4()))
+        return obj
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and tells file storage, which keeps track of
+        the objects it holds that changed since it saved them"""
+        old_value = self.__dict__.get(name)
+        super().__setattr__(name, value)
+        if models.storage_t != "db" and \
+                getattr(models, "storage", None) is not None:
+            models.storage.update(self, name, old_value)
+
+    @property
+    def is_changed(self):
+        """True if storage holds the instance and it changed since storage
+        last saved it"""
+        return models.storage.is_changed(self)
+
     def __str__(self):
         """String representation of the BaseModel class"""
-        return "[{}] ({}) {}".format(self.__class__.__name__, self.id, self.__dict__)
+        return "[{}] ({}) {}".format(self.__class__.__name__, self.id,
+                                     self.__dict__)
 
     def save(self):
         """Updates the attribute 'updated_at' with the current datetime"""
@@ -57,9 +98,11 @@ class BaseModel:
         """Returns a dictionary containing all keys/values of the instance"""
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(TIME_FORMAT)
+            new_dict["created_at"] = new_dict["created_at"].strftime(
+                TIME_FORMAT)
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(TIME_FORMAT)
+            new_dict["updated_at"] = new_dict["updated_at"].strftime(
+                TIME_FORMAT)
         new_dict["__class__"] = self.__class__.__name__
         new_dict.pop("_sa_instance_state", None)
         if secure_pwd and 'password' in new_dict:
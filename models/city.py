@@ -13,7 +13,7 @@ class City(BaseModel, Base):
     if models.storage_t == "db":
         __tablename__ = 'cities'
         state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
-        name = Column(String(128), nullable=False)
+        name = Column(String(128), nullable=False, index=True)
         places = relationship("Place", backref="cities")
     else:
         state_id = ""
@@ -22,3 +22,10 @@ class City(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes city"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != "db":
+        @property
+        def places(self):
+            """getter for list of place instances located in the city"""
+            from models.place import Place
+            return models.storage.related(Place, "city_id", self.id)
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+"""
+Contains the CachedStorage class
+"""
+
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+
+def sizeof(obj):
+    """Returns an estimate of the bytes obj and its attributes take"""
+    attrs = getattr(obj, "__dict__", {})
+    return sys.getsizeof(obj) + sys.getsizeof(attrs) + \
+        sum(sys.getsizeof(key) + sys.getsizeof(value)
+            for key, value in attrs.items())
+
+
+class CachedStorage:
+    """Wraps a storage engine, keeping the objects get() finds in a least
+    recently used cache bounded in entries and in bytes, whose entries
+    expire after ttl seconds; new(), delete() and save() drop the objects
+    they touch from it, and every other method goes to the engine
+
+    Changes other processes make to a database are only seen once entries
+    expire, so models gives them a ttl by default with DBStorage."""
+
+    def __init__(self, storage, max_entries=1024, max_bytes=None, ttl=None):
+        """Wraps storage, keeping up to max_entries objects, and up to
+        max_bytes of them if given, for up to ttl seconds if given"""
+        self.__storage = storage
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        # OrderedDict - <class name>.id -> (copy, size, expiry), oldest first
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        # int - bumped by each invalidation, so a get() that raced one
+        # does not cache what it read before it
+        self.__generation = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+
+    def __getattr__(self, name):
+        """Returns the attribute name of the wrapped engine"""
+        return getattr(self.__storage, name)
+
+    def __key(self, cls, id):
+        """Returns the cache key of the object of cls with that id"""
+        return (cls if isinstance(cls, str) else cls.__name__) + "." + id
+
+    def __lookup(self, key):
+        """Returns the copy cached under key, or None"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[2] is not None and \
+                    entry[2] <= time.monotonic():
+                self.__drop(key)
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return entry[0]
+
+    def __store(self, key, copy, generation):
+        """Caches copy under key unless an invalidation happened since
+        generation, evicting the least recently used entries to make room"""
+        size = sizeof(copy)
+        expiry = None if self.__ttl is None else \
+            time.monotonic() + self.__ttl
+        with self.__lock:
+            if generation != self.__generation:
+                return
+            self.__drop(key)
+            self.__entries[key] = (copy, size, expiry)
+            self.__bytes += size
+            while self.__entries and (
+                    len(self.__entries) > self.__max_entries or
+                    self.__max_bytes is not None and
+                    self.__bytes > self.__max_bytes):
+                self.__drop(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    def __drop(self, key):
+        """Removes the entry of key, if any; the lock must be held"""
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__bytes -= entry[1]
+
+    def invalidate(self, keys=None):
+        """Drops the entries of keys, or every entry if keys is None"""
+        with self.__lock:
+            self.__generation += 1
+            self.__invalidations += 1
+            if keys is None:
+                self.__entries.clear()
+                self.__bytes = 0
+            for key in keys or ():
+                self.__drop(key)
+
+    def get(self, cls, id, prefetch=None, **kwargs):
+        """Returns the object of cls with that id, from the cache if it is
+        there and the engine can attach it; objects with prefetched
+        relationships, and those the engine does not detach, are never
+        cached"""
+        if prefetch or not isinstance(id, str) or \
+                not isinstance(cls, (type, str)):
+            return self.__storage.get(cls, id, prefetch=prefetch, **kwargs)
+        key = self.__key(cls, id)
+        copy = self.__lookup(key)
+        if copy is not None:
+            obj = self.__storage.attach(copy)
+            if obj is not None:
+                return obj
+        generation = self.__generation
+        obj = self.__storage.get(cls, id, **kwargs)
+        if obj is None:
+            if copy is not None:
+                self.invalidate([key])
+            return None
+        copy = self.__storage.detach(obj)
+        if copy is not None:
+            self.__store(key, copy, generation)
+        return obj
+
+    def new(self, obj):
+        """Adds obj to the engine, dropping its cached copy"""
+        self.invalidate([self.__key(type(obj), obj.id)])
+        self.__storage.new(obj)
+
+    def delete(self, obj=None):
+        """Deletes obj from the engine, emptying the cache, as the database
+        may delete the objects that depend on obj along with it"""
+        if obj is not None:
+            self.invalidate()
+        self.__storage.delete(obj)
+
+    def save(self):
+        """Saves the engine, then drops the cached copies of the objects
+        that changed"""
+        keys = [self.__key(type(obj), obj.id)
+                for obj in self.__storage.unsaved()]
+        self.__storage.save()
+        self.invalidate(keys)
+
+    def bulk_new(self, objs):
+        """Adds and saves every object of objs, dropping their cached
+        copies"""
+        objs = list(objs)
+        self.__storage.bulk_new(objs)
+        self.invalidate([self.__key(type(obj), obj.id) for obj in objs])
+
+    def bulk_get(self, cls, ids, **kwargs):
+        """Returns the objects of cls whose id is in ids, by id, from the
+        engine, which loads them in far fewer queries than get() would"""
+        return self.__storage.bulk_get(cls, ids, **kwargs)
+
+    def bulk_update(self, cls, rows, **kwargs):
+        """Updates and saves the objects of cls rows describe, dropping
+        their cached copies"""
+        objs = self.__storage.bulk_update(cls, rows, **kwargs)
+        self.invalidate([self.__key(cls, obj.id) for obj in objs])
+        return objs
+
+    def bulk_delete(self, objs):
+        """Deletes every object of objs, emptying the cache, as delete()
+        does"""
+        self.invalidate()
+        self.__storage.bulk_delete(objs)
+
+    def reload(self):
+        """Reloads the engine and empties the cache"""
+        self.__storage.reload()
+        self.invalidate()
+
+    def cache_stats(self):
+        """Returns the number of entries, their estimated bytes, and the
+        hits, misses, evictions and invalidations so far"""
+        with self.__lock:
+            return {"entries": len(self.__entries), "bytes": self.__bytes,
+                    "max_entries": self.__max_entries,
+                    "max_bytes": self.__max_bytes, "ttl": self.__ttl,
+                    "hits": self.__hits, "misses": self.__misses,
+                    "evictions": self.__evictions,
+                    "invalidations": self.__invalidations}
@@ -3,44 +3,230 @@
 Contains the class DBStorage
 """
 
+from collections.abc import ItemsView, Mapping, ValuesView
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, TIME_FORMAT
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from datetime import datetime
+import itertools
 from os import getenv
-<<<<<<< HEAD
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
-
-classes = {
-    "Amenity": Amenity, 
-    "City": City,
-    "Place": Place, 
-    "Review": Review, 
-    "State": State, 
-    "User": User
-}
-
-class DBStorage:
-    """Interacts with the MySQL database"""
-=======
+import threading
+import time
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, inspect, or_, \
+    select, union_all
+from sqlalchemy.orm import joinedload, load_only, \
+    make_transient_to_detached, scoped_session, selectinload, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import QueuePool
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# loader options, by the name of the strategy they load relationships with
+loaders = {"selectin": selectinload, "joined": joinedload}
+
+
+def prefetch_options(clss, prefetch, strategy="selectin"):
+    """Returns the loader options that load each dotted path of
+    relationships of clss in prefetch along with clss, using strategy:
+    "selectin" (one more query per relationship) or "joined" (a JOIN)"""
+    options = []
+    for path in prefetch or ():
+        option = None
+        cls = clss
+        for name in path.split("."):
+            attr = getattr(cls, name, None)
+            if attr is None:
+                break
+            option = loaders[strategy](attr) if option is None else \
+                getattr(option, loaders[strategy].__name__)(attr)
+            cls = attr.property.mapper.class_
+        if option is not None:
+            options.append(option)
+    return options
+
+
+def paged(query, clss, limit=None, after=None, columns=None):
+    """Returns query ordered by (created_at, id), starting past after, a
+    (created_at, id) pair, limited to limit rows and loading only columns,
+    with id and created_at, if given"""
+    if columns:
+        query = query.options(load_only(*[
+            getattr(clss, name) for name in set(columns) | {"created_at"}
+            if name in clss.__table__.columns]))
+    if after is not None:
+        created_at = datetime.strptime(after[0], TIME_FORMAT)
+        query = query.filter(or_(
+            clss.created_at > created_at,
+            and_(clss.created_at == created_at, clss.id > after[1])))
+    return query.order_by(clss.created_at, clss.id).limit(limit)
+
+
+class Rows(Mapping):
+    """Maps <class name>.id to the rows of the tables of some classes,
+    querying the database only as it is looked up or iterated"""
+
+    def __init__(self, session, clsses, limit=None, offset=None,
+                 columns=None, prefetch=None, strategy="selectin"):
+        """Remembers what to query: the rows of clsses, in id order past
+        the first offset ones and up to limit of them, with only columns,
+        and the relationships in prefetch as prefetch_options says"""
+        self.__session = session
+        self.__clsses = clsses
+        self.__limit = limit
+        self.__offset = offset or 0
+        self.__columns = columns
+        self.__prefetch = prefetch
+        self.__strategy = strategy
+
+    def __query(self, clss, *entities):
+        """Returns the query of the rows of clss, or of entities of them"""
+        query = self.__session.query(*(entities or (clss,)))
+        if self.__columns and not entities:
+            query = query.options(load_only(*[
+                getattr(clss, name) for name in self.__columns
+                if name in clss.__table__.columns]))
+        if self.__prefetch and not entities:
+            query = query.options(*prefetch_options(
+                clss, self.__prefetch, self.__strategy))
+        return query
+
+    def __pages(self):
+        """Yields each class along with the offset and limit of its rows"""
+        offset, limit = self.__offset, self.__limit
+        for clss in self.__clsses:
+            if limit is not None and limit <= 0:
+                return
+            if offset or limit is not None:
+                count = self.__query(clss, func.count(clss.id)).scalar()
+                if count <= offset:
+                    offset -= count
+                    continue
+                yield clss, offset, limit
+                if limit is not None:
+                    limit -= count - offset
+                offset = 0
+            else:
+                yield clss, None, None
+
+    def __rows(self, clss, offset, limit, *entities):
+        """Returns the query of a page of the rows of clss"""
+        query = self.__query(clss, *entities)
+        if offset is not None:
+            query = query.order_by(clss.id).offset(offset).limit(limit)
+        return query
+
+    def __getitem__(self, key):
+        """Returns the object of key, querying only its row"""
+        name, _, id = key.partition(".")
+        for clss in self.__clsses:
+            if clss.__name__ == name:
+                if self.__offset or self.__limit is not None:
+                    for obj in self.values():
+                        if obj.id == id:
+                            return obj
+                    break
+                obj = self.__query(clss).filter(clss.id == id).first()
+                if obj is not None:
+                    return obj
+        raise KeyError(key)
+
+    def __iter__(self):
+        """Yields the keys, querying only the id column"""
+        for clss, offset, limit in self.__pages():
+            for id, in self.__rows(clss, offset, limit, clss.id):
+                yield clss.__name__ + "." + id
+
+    def __len__(self):
+        """Returns the number of rows, as counted by the database"""
+        total = 0
+        for clss in self.__clsses:
+            total += self.__query(clss, func.count(clss.id)).scalar()
+        total = max(total - self.__offset, 0)
+        if self.__limit is not None:
+            total = min(total, self.__limit)
+        return total
+
+    def rows(self):
+        """Yields the (key, object) pairs, fetching rows in batches"""
+        for clss, offset, limit in self.__pages():
+            query = self.__rows(clss, offset, limit)
+            if not self.__prefetch or self.__strategy != "joined":
+                # rows joined to collections cannot be fetched in batches
+                query = query.yield_per(1000)
+            for obj in query:
+                yield clss.__name__ + "." + obj.id, obj
+
+    def items(self):
+        """Returns a view of the (key, object) pairs"""
+        return RowsItems(self)
+
+    def values(self):
+        """Returns a view of the objects"""
+        return RowsValues(self)
+
+
+class RowsItems(ItemsView):
+    """Items of Rows, iterated without a query per row"""
+
+    def __iter__(self):
+        """Yields the (key, object) pairs"""
+        return self._mapping.rows()
+
+
+class RowsValues(ValuesView):
+    """Values of Rows, iterated without a query per row"""
+
+    def __iter__(self):
+        """Yields the objects"""
+        for key, obj in self._mapping.rows():
+            yield obj
+
+
+class MonitoredPool(QueuePool):
+    """QueuePool that counts the checkouts that waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        """Starts the counts at zero"""
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def _do_get(self):
+        """Checks a connection out, timing it if none is free"""
+        if self.checkedin() or self._max_overflow < 0 or \
+                self.overflow() < self._max_overflow:
+            return super()._do_get()
+        start = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            self.waits += 1
+            self.wait_time += time.monotonic() - start
+
 
 class DBStorage:
-    """interaacts with the MySQL database"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+    """Interacts with the MySQL database"""
     __engine = None
     __session = None
+    # dictionary - <class name> -> number of rows, kept up by each commit
+    __counts = None
+    # guards __counts against the sessions of other threads
+    __counts_lock = threading.Lock()
+    # float - when __counts was last counted by the database
+    __counted_at = 0
+    # float - seconds stats() trusts __counts before counting again
+    __stats_ttl = float(getenv('HBNB_STATS_TTL', 0))
+    # dictionary - <class name> -> tick of the last change to its rows
+    __generations = {}
+    # iterator - ticks that only grow, taken atomically by any thread
+    __ticks = itertools.count(1)
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -49,100 +235,339 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-<<<<<<< HEAD
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.format(
-            HBNB_MYSQL_USER,
-            HBNB_MYSQL_PWD,
-            HBNB_MYSQL_HOST,
-            HBNB_MYSQL_DB
-        ))
-=======
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+        connect_args = {}
+        timeout = getenv('HBNB_MYSQL_STATEMENT_TIMEOUT')
+        if timeout:
+            connect_args['init_command'] = \
+                'SET SESSION max_execution_time={:d}'.format(int(timeout))
+        self.__engine = create_engine(
+            'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                 HBNB_MYSQL_PWD,
+                                                 HBNB_MYSQL_HOST,
+                                                 HBNB_MYSQL_DB),
+            poolclass=MonitoredPool,
+            pool_size=int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            max_overflow=int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+            pool_timeout=float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            pool_recycle=int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            pool_pre_ping=getenv('HBNB_MYSQL_POOL_PRE_PING', '1') == '1',
+            echo=getenv('HBNB_MYSQL_ECHO') == '1',
+            connect_args=connect_args)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-<<<<<<< HEAD
-        """Query on the current database session"""
-        new_dict = {}
-        for clss in classes.values():
-            if cls is None or cls is clss or cls is clss.__name__:
-                objs = self.__session.query(clss).all()
-                for obj in objs:
-                    key = obj.__class__.__name__ + '.' + obj.id
-                    new_dict[key] = obj
-        return new_dict
+    def all(self, cls=None, limit=None, offset=None, columns=None,
+            prefetch=None, strategy="selectin"):
+        """Query on the current database session: returns a mapping of
+        <class name>.id to the objects of cls, or of every class, that
+        only queries the rows it is asked for, loading the relationships
+        in prefetch with them"""
+        clsses = [clss for clss in classes.values()
+                  if cls is None or cls is clss or cls == clss.__name__]
+        return Rows(self.__session, clsses, limit, offset, columns,
+                    prefetch, strategy)
 
     def new(self, obj):
         """Add the object to the current database session"""
         self.__session.add(obj)
+        self.__bump([obj.__class__.__name__])
 
-    def save(self):
-        """Commit all changes of the current database session"""
-        self.__session.commit()
+    def __flushed(self, session, context):
+        """Notes, in the session, the objects its flush wrote, for save()
+        to commit, and how many rows of each class it inserted and deleted,
+        for __committed() to count"""
+        session.info.setdefault("flushed", set()).update(
+            obj for obj in itertools.chain(
+                session.new, session.deleted, session.dirty)
+            if obj.__class__.__name__ in classes)
+        counts = session.info.setdefault("counts", {})
+        for objs, n in ((session.new, 1), (session.deleted, -1)):
+            for obj in objs:
+                name = obj.__class__.__name__
+                if name in classes:
+                    counts[name] = counts.get(name, 0) + n
 
-    def delete(self, obj=None):
-        """Delete from the current database session obj if not None"""
-=======
-        """query on the current database session"""
-        new_dict = {}
-        for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
-                    key = obj.__class__.__name__ + '.' + obj.id
-                    new_dict[key] = obj
-        return (new_dict)
+    def __committed(self, session):
+        """Adds the rows the transaction of session inserted and deleted to
+        the counters stats() keeps"""
+        session.info.pop("flushed", None)
+        counts = session.info.pop("counts", {})
+        with self.__counts_lock:
+            if self.__counts is not None:
+                for name, n in counts.items():
+                    self.__counts[name] = self.__counts.get(name, 0) + n
 
-    def new(self, obj):
-        """add the object to the current database session"""
-        self.__session.add(obj)
+    def __discarded(self, session, *args):
+        """Forgets what the transaction of session flushed, as it was rolled
+        back or never committed"""
+        session.info.pop("flushed", None)
+        session.info.pop("counts", None)
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """Commit the changes of the current database session, if any,
+        including those a query already flushed"""
+        session = self.__session
+        flushed = session.info.get("flushed", ())
+        if session.new or session.deleted or session.dirty or flushed:
+            self.__bump({obj.__class__.__name__ for obj in itertools.chain(
+                session.new, session.deleted, session.dirty, flushed)})
+            session.commit()
+
+    def is_changed(self, obj):
+        """Tells if obj was added to or changed in the session of this
+        thread since it was last committed"""
+        state = inspect(obj, raiseerr=False)
+        if state is None:
+            return False
+        session = self.__session
+        return obj in session.new or obj in session.dirty or \
+            obj in session.info.get("flushed", ()) and not state.was_deleted
+
+    def unsaved(self):
+        """Returns the objects save() would insert or update, flushed by a
+        query already or not"""
+        session = self.__session
+        objs = list(session.new) + list(session.dirty)
+        listed = set(objs)
+        objs.extend(obj for obj in session.info.get("flushed", ())
+                    if not inspect(obj).was_deleted and obj not in listed)
+        return objs
 
     def delete(self, obj=None):
-        """delete from the current database session obj if not None"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+        """Delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__bump([obj.__class__.__name__])
+
+    def __bump(self, names):
+        """Counts a change to the rows of each class of names"""
+        tick = next(self.__ticks)
+        for name in names:
+            self.__generations[name] = tick
+
+    def generation(self, *clss):
+        """Returns what changes whenever rows of clss, or of any class if
+        none is given, are added, saved or deleted: the number of changes
+        made through this storage, with the number of rows of each table
+        and their latest updated_at, which tell the changes of other
+        processes; these are read in one query on a connection of its
+        own, so no transaction of the session hides them"""
+        clsses = [classes[cls] if isinstance(cls, str) else cls
+                  for cls in clss] or list(classes.values())
+        local = sum(self.__generations.get(clss.__name__, 0)
+                    for clss in clsses)
+        query = union_all(*[select(func.count(), func.max(clss.updated_at))
+                            for clss in clsses])
+        with self.__engine.connect() as connection:
+            rows = connection.execute(query).all()
+        return (local,) + tuple(tuple(row) for row in rows)
+
+    def bulk_new(self, objs):
+        """Adds every object of objs, then commits them in one transaction"""
+        for obj in objs:
+            self.new(obj)
+        self.save()
+
+    def bulk_get(self, cls, ids, chunk_size=1000):
+        """Returns the objects of cls whose id is in ids, by id, loading
+        chunk_size ids per query"""
+        clss = classes[cls] if isinstance(cls, str) else cls
+        ids = list({id for id in ids if isinstance(id, str)})
+        found = {}
+        for i in range(0, len(ids), chunk_size):
+            found.update((obj.id, obj) for obj in self.__session.query(
+                clss).filter(clss.id.in_(ids[i:i + chunk_size])))
+        return found
+
+    def bulk_update(self, cls, rows, chunk_size=1000):
+        """Sets on the object of cls of each dictionary of rows, found by
+        its id, the other attributes of the dictionary, then commits them
+        in one transaction; returns the objects, skipping the ids not
+        found, after loading them chunk_size ids per query"""
+        found = self.bulk_get(cls, [row.get("id") for row in rows],
+                              chunk_size)
+        now = datetime.utcnow()
+        objs = []
+        for row in rows:
+            obj = found.get(row.get("id"))
+            if obj is None:
+                continue
+            for attr, value in row.items():
+                if attr not in ("id", "created_at", "updated_at",
+                                "__class__"):
+                    setattr(obj, attr, value)
+            obj.updated_at = now
+            objs.append(obj)
+        self.save()
+        return objs
+
+    def bulk_delete(self, objs):
+        """Deletes every object of objs, then commits in one transaction"""
+        for obj in objs:
+            self.delete(obj)
+        self.save()
 
     def reload(self):
-<<<<<<< HEAD
-        """Reload data from the database"""
+        """Create the tables and the registry of the sessions, which
+        gives each thread its own"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
-        Session = scoped_session(sess_factory)
-        self.__session = Session()
+        event.listen(sess_factory, "after_flush", self.__flushed)
+        event.listen(sess_factory, "after_commit", self.__committed)
+        event.listen(sess_factory, "after_begin", self.__discarded)
+        event.listen(sess_factory, "after_rollback", self.__discarded)
+        self.__session = scoped_session(sess_factory)
+        with self.__counts_lock:
+            self.__counts = None
+        self.__bump(classes)
 
     def close(self):
-        """Call remove() method on the private session attribute"""
+        """Call remove() method on the private session attribute, closing
+        the session of the current thread; the next call opens a new one"""
         self.__session.remove()
 
-    def get(self, cls, id):
-        """Retrieve an object"""
+    def get(self, cls, id, prefetch=None, strategy="selectin"):
+        """Retrieve an object by its primary key, from the session if it
+        is already there, loading the relationships in prefetch with it"""
         if cls in classes.values() and id and isinstance(id, str):
-            key = "{}.{}".format(cls.__name__, id)
-            return self.all(cls).get(key)
+            return self.__session.get(cls, id, options=prefetch_options(
+                cls, prefetch, strategy))
         return None
 
+    def __pending(self, cls):
+        """Tells if the session of this thread has objects of cls added or
+        changed since it was last committed"""
+        session = self.__session
+        return any(isinstance(obj, cls)
+                   for obj in itertools.chain(session.new, session.dirty))
+
+    def detach(self, obj):
+        """Returns a copy of the columns of obj that belongs to no session,
+        for attach() to hand to any thread, or None while the session of
+        this thread has unsaved objects of its class, which the copy could
+        hold before they are committed"""
+        if self.__pending(type(obj)):
+            return None
+        mapper = inspect(type(obj))
+        copy = mapper.class_manager.new_instance()
+        for attr in mapper.column_attrs:
+            set_committed_value(copy, attr.key, getattr(obj, attr.key))
+        make_transient_to_detached(copy)
+        return copy
+
+    def attach(self, copy):
+        """Returns the object of the session of this thread that copy, made
+        by detach(), stands for, without querying the database: the one
+        already in the session, as it may have changes of its own, else
+        copy merged into it; returns None while the session has unsaved
+        objects of its class, which copy would not show"""
+        session = self.__session
+        obj = session.identity_map.get(inspect(copy).key)
+        if obj is not None:
+            return obj
+        if self.__pending(type(copy)):
+            return None
+        return session.merge(copy, load=False)
+
+    def page(self, cls, limit=None, after=None, attr=None, parent_id=None,
+             columns=None):
+        """Returns up to limit objects of cls, only those whose attr is
+        parent_id if attr is given, in (created_at, id) order, starting
+        past after, a (created_at, id) pair, loading only columns if given,
+        with a single query"""
+        clss = classes[cls] if isinstance(cls, str) else cls
+        query = self.__session.query(clss)
+        if attr is not None:
+            query = query.filter(getattr(clss, attr) == parent_id)
+        return paged(query, clss, limit, after, columns).all()
+
+    def all_sorted(self, cls, key="name", attr=None, parent_id=None):
+        """Returns the objects of cls, only those whose attr is parent_id
+        if attr is given, ordered by their column key then id by the
+        database, through the index on key"""
+        clss = classes[cls] if isinstance(cls, str) else cls
+        query = self.__session.query(clss)
+        if attr is not None:
+            query = query.filter(getattr(clss, attr) == parent_id)
+        return query.order_by(getattr(clss, key), clss.id).all()
+
+    def version(self, cls, id):
+        """Returns the updated_at of the object of cls with that id, or
+        None if there is none, without loading the object"""
+        if cls not in classes.values():
+            return None
+        return self.__session.execute(
+            select(cls.updated_at).where(cls.id == id)).scalar_one_or_none()
+
+    def collection_version(self, cls, attr=None, parent_id=None):
+        """Returns the number of objects of cls, only those whose attr is
+        parent_id if attr is given, and their latest updated_at, or None
+        if there are none, with a single query that loads no object"""
+        clss = classes[cls] if isinstance(cls, str) else cls
+        query = select(func.count(), func.max(clss.updated_at))
+        if attr is not None:
+            query = query.where(getattr(clss, attr) == parent_id)
+        count, latest = self.__session.execute(query).one()
+        return count, latest
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None, columns=None):
+        """Returns the places in the cities of states or in cities, or all
+        of them if both are empty, that have every amenity of amenities,
+        with a single query, paged as page() does"""
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.filter(or_(
+                Place.city_id.in_(select(City.id).where(
+                    City.state_id.in_(list(states or ())))),
+                Place.city_id.in_(list(cities or ()))))
+        for amenity_id in set(amenities or ()):
+            query = query.filter(Place.amenities.any(Amenity.id == amenity_id))
+        return paged(query, Place, limit, after, columns).all()
+
+    def pool_status(self):
+        """Returns the state of the connection pool, for monitoring"""
+        pool = self.__engine.pool
+        return {"size": pool.size(), "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(), "waits": pool.waits,
+                "wait_time": pool.wait_time}
+
+    def __fresh_counts(self):
+        """Returns a copy of the counters if they are younger than
+        HBNB_STATS_TTL seconds, else None"""
+        with self.__counts_lock:
+            if self.__counts is None or \
+                    time.monotonic() - self.__counted_at >= self.__stats_ttl:
+                return None
+            return dict(self.__counts)
+
     def count(self, cls=None):
-        """Count the number of objects"""
-        return len(self.all(cls))
-=======
-        """reloads data from the database"""
-        Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
-        Session = scoped_session(sess_factory)
-        self.__session = Session
+        """Count the number of objects of cls, with a single COUNT on its
+        table unless the counters are fresh, or of every class, as stats()
+        does"""
+        if cls is None:
+            return sum(self.stats().values())
+        clss = classes.get(cls) if isinstance(cls, str) else cls
+        if clss not in classes.values():
+            return 0
+        counts = self.__fresh_counts()
+        if counts is not None:
+            return counts[clss.__name__]
+        return self.__session.execute(
+            select(func.count()).select_from(clss)).scalar_one()
 
-    def close(self):
-        """call remove() method on the private session attribute"""
-        self.__session.remove()
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+    def stats(self):
+        """Returns the number of objects of each class, by class name,
+        counted by a single query unless the counters each commit keeps up
+        are younger than HBNB_STATS_TTL seconds"""
+        counts = self.__fresh_counts()
+        if counts is None:
+            now = time.monotonic()
+            counts = dict(self.__session.execute(select(*[
+                select(func.count(clss.id)).scalar_subquery().label(name)
+                for name, clss in classes.items()])).one()._mapping)
+            with self.__counts_lock:
+                self.__counts = dict(counts)
+                self.__counted_at = now
+        return counts
@@ -3,75 +3,872 @@
 Contains the FileStorage class
 """
 
-import json
+from collections import OrderedDict
+import contextlib
+import copy
+from datetime import datetime
+import functools
+from itertools import islice
+import os
+import shutil
+import threading
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, TIME_FORMAT
 from models.city import City
+from models.engine.serializers import detect, get_serializer
+from models.engine.sorted_index import SortedIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
+           "Place": Place, "Review": Review, "State": State, "User": User}
+# guards the objects and indexes of FileStorage against other threads
+lock = threading.RLock()
+
+
+def synchronized(method):
+    """Makes method run while holding lock"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        """Calls method while holding lock"""
+        with lock:
+            return method(*args, **kwargs)
+    return wrapper
+
+
+class Unloaded:
+    """Stands in for a record of the JSON file not turned into an object"""
+    __slots__ = ("name", "start", "end", "attrs", "created_at",
+                 "updated_at")
+
+    def __init__(self, name, start, end, attrs, created_at=None,
+                 updated_at=None):
+        """Remembers the class name, span, foreign keys and creation and
+        update times of a record"""
+        self.name = name
+        self.start = start
+        self.end = end
+        self.attrs = attrs
+        self.created_at = created_at
+        self.updated_at = updated_at
 
-classes = {
-    "Amenity": Amenity, 
-    "BaseModel": BaseModel, 
-    "City": City,
-    "Place": Place, 
-    "Review": Review, 
-    "State": State, 
-    "User": User
-}
 
 class FileStorage:
-    """Serializes instances to a JSON file & deserializes back to instances"""
+    """serializes instances to a JSON file & deserializes back to instances"""
 
+    # string - path to the JSON file
     __file_path = "file.json"
+    # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - <class name> -> {<class name>.id: obj}, mirrors __objects
+    __by_class = {}
+    # dictionary - (<class name>, <attribute>) -> {<parent id>: {key: obj}}
+    __by_parent = {}
+    # dictionary - <class name> -> SortedIndex of keys by (created_at, id)
+    __by_order = {}
+    # dictionary - (<class name>, <attribute>) -> {<parent id>: SortedIndex
+    # of the keys of __by_parent by (created_at, id)}
+    __by_parent_order = {}
+    # OrderedDict - search_places() arguments -> SortedIndex of the keys of
+    # the places found, least recently used first, dropped on any change
+    __searches = OrderedDict()
+    # dictionary - (<class name>, <attribute>) -> SortedIndex of keys by
+    # value of the attribute, built by all_sorted() and kept up from then
+    __by_key = {}
+    # the __objects dictionary the indexes were built from
+    __indexed = None
+    # dictionary - <class name> -> number of changes to its objects
+    __generations = {}
+    # serializer - writes the file, set by HBNB_FILE_FORMAT
+    __format = get_serializer(os.getenv("HBNB_FILE_FORMAT", "json"))
+    # serializer - wrote the file and its log as they are on disk
+    __file_format = __format
+    __log_format = __format
+    # dictionary - <class name>.id -> (obj, fingerprint, serialized obj)
+    # as last saved
+    __serialized = {}
+    # the types of attribute values that can change in place
+    __mutable = frozenset((list, dict, set))
+    # set - keys of the objects added or changed since the last save
+    __changed = set()
+    # set - keys of the objects deleted since the last save
+    __deleted = set()
+    # boolean - append changes to <__file_path>.log instead of rewriting
+    __journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - number of records in the log file
+    __log_records = 0
+    # integer - where the last whole record of the log file ends
+    __log_end = 0
+    # integer - log size at which save() folds the log into the snapshot
+    __compact_at = int(os.getenv("HBNB_FILE_COMPACT_AT", 1000))
+    # boolean - keep records as Unloaded until they are first accessed
+    __lazy = os.getenv("HBNB_FILE_LAZY") == "1"
+    # string - when close() reloads the file: always, on-change or never
+    __reload_policy = os.getenv("HBNB_FILE_RELOAD", "on-change")
+    # tuple - versions of the JSON file and its log as last read or written
+    __file_stamp = None
+    # boolean - flush the file and its log to disk before returning
+    __fsync = os.getenv("HBNB_FILE_FSYNC") == "1"
+    # boolean - whether this process holds the lock on <__file_path>.lock
+    __flocked = False
+    # foreign keys indexed for relationship lookups, by class name
+    # (a list attribute is indexed under each of its items)
+    foreign_keys = {"City": ("state_id",),
+                    "Place": ("city_id", "amenity_ids"),
+                    "Review": ("place_id",)}
+
+    def __index(self):
+        """Returns the per-class index, rebuilding it if __objects changed"""
+        if FileStorage.__indexed is not self.__objects:
+            if FileStorage.__indexed is not None:
+                # the log no longer describes __objects
+                FileStorage.__log_records = self.__compact_at
+            FileStorage.__by_class = {}
+            FileStorage.__by_parent = {}
+            FileStorage.__by_order = {}
+            FileStorage.__by_parent_order = {}
+            FileStorage.__by_key = {}
+            FileStorage.__searches = OrderedDict()
+            FileStorage.__indexed = self.__objects
+            for key, obj in self.__objects.items():
+                self.__add_to_index(key, obj)
+        return self.__by_class
+
+    def __name_of(self, obj):
+        """Returns the class name of obj, which may be Unloaded"""
+        if type(obj) is Unloaded:
+            return obj.name
+        return obj.__class__.__name__
+
+    def __attr_of(self, obj, attr):
+        """Returns the attribute attr of obj, which may be Unloaded"""
+        if type(obj) is Unloaded:
+            return obj.attrs.get(attr)
+        return getattr(obj, attr, None)
+
+    def __order_of(self, obj, attr="created_at"):
+        """Returns the created_at, or the time attr, of obj, which may be
+        Unloaded, as it is written in the JSON file"""
+        time = getattr(obj, attr) if type(obj) is Unloaded else \
+            obj.__dict__.get(attr)
+        if hasattr(time, "strftime"):
+            return time.strftime(TIME_FORMAT)
+        return str(time)
+
+    def __sort_key_of(self, obj, attr):
+        """Returns what orders obj by its attribute attr, None last and
+        strings regardless of case, as MySQL's default collation does"""
+        value = getattr(obj, attr, None)
+        if isinstance(value, str):
+            value = value.lower()
+        return (value is None, value)
+
+    def __parents(self, value):
+        """Returns the values a foreign key attribute is indexed under"""
+        return value if isinstance(value, list) else (value,)
+
+    def __add_to_index(self, key, obj, attr=None):
+        """Adds obj to the indexes, or to one foreign key index"""
+        self.__searches.clear()
+        name = self.__name_of(obj)
+        if attr is None:
+            self.__by_class.setdefault(name, {})[key] = obj
+            self.__by_order.setdefault(name, SortedIndex()).add(
+                key, self.__order_of(obj))
+            for index_name, sort_attr in list(self.__by_key):
+                if index_name != name:
+                    continue
+                if type(obj) is Unloaded:
+                    # the value is not known without building obj
+                    del self.__by_key[(name, sort_attr)]
+                else:
+                    self.__by_key[(name, sort_attr)].add(
+                        key, self.__sort_key_of(obj, sort_attr))
+        for fk in self.foreign_keys.get(name, ()):
+            if attr is None or fk == attr:
+                children = self.__by_parent.setdefault((name, fk), {})
+                ordered = self.__by_parent_order.setdefault((name, fk), {})
+                for parent in self.__parents(self.__attr_of(obj, fk)):
+                    children.setdefault(parent, {})[key] = obj
+                    ordered.setdefault(parent, SortedIndex()).add(
+                        key, self.__order_of(obj))
+
+    def __remove_from_index(self, key, obj, attr=None, value=None):
+        """Removes obj from the indexes, or from one foreign key index"""
+        self.__searches.clear()
+        name = self.__name_of(obj)
+        if attr is None:
+            self.__by_class.get(name, {}).pop(key, None)
+            if name in self.__by_order:
+                self.__by_order[name].remove(key)
+            for (index_name, sort_attr), index in self.__by_key.items():
+                if index_name == name:
+                    index.remove(key)
+        for fk in self.foreign_keys.get(name, ()):
+            if attr is None or fk == attr:
+                parents = self.__parents(
+                    value if attr else self.__attr_of(obj, fk))
+                children = self.__by_parent.get((name, fk), {})
+                ordered = self.__by_parent_order.get((name, fk), {})
+                for parent in parents:
+                    if parent in children:
+                        children[parent].pop(key, None)
+                        ordered[parent].remove(key)
+                        if not children[parent]:
+                            del children[parent]
+                            del ordered[parent]
 
-    def all(self, cls=None):
-        """Returns the dictionary __objects"""
-        if cls:
-            return {key: value for key, value in self.__objects.items() if isinstance(value, cls) or cls == value.__class__.__name__}
-        return self.__objects
+    def __replace_in_index(self, key, old, obj):
+        """Puts obj in the indexes in place of old, stored under the same
+        key, only moving it in the sorted ones if its place changed"""
+        name = self.__name_of(obj)
+        fks = self.foreign_keys.get(name, ())
+        if self.__order_of(old) != self.__order_of(obj) or \
+                any(self.__attr_of(old, fk) != self.__attr_of(obj, fk)
+                    for fk in fks):
+            self.__remove_from_index(key, old)
+            self.__add_to_index(key, obj)
+            return
+        self.__by_class[name][key] = obj
+        for fk in fks:
+            children = self.__by_parent[(name, fk)]
+            for parent in self.__parents(self.__attr_of(obj, fk)):
+                children[parent][key] = obj
+        for index_name, sort_attr in list(self.__by_key):
+            if index_name != name:
+                continue
+            if type(obj) is Unloaded:
+                del self.__by_key[(name, sort_attr)]
+            else:
+                self.__by_key[(name, sort_attr)].add(
+                    key, self.__sort_key_of(obj, sort_attr))
 
+    def __key(self, obj):
+        """Returns the <class name>.id key of obj"""
+        return obj.__class__.__name__ + "." + str(obj.__dict__.get("id"))
+
+    def __stamp(self):
+        """Returns the inode, size and mtime of the JSON file and its log"""
+        stamp = []
+        for path in (self.__file_path, self.__file_path + ".log"):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def __class_names(self, cls):
+        """Returns the names of the classes matched by cls"""
+        if isinstance(cls, str):
+            return [cls]
+        return [name for name, clss in classes.items()
+                if issubclass(clss, cls)]
+
+    @contextlib.contextmanager
+    def __locked(self, shared=False):
+        """Holds the lock on <__file_path>.lock, so that other processes
+        can neither write the file nor, unless shared, read it meanwhile"""
+        if fcntl is None or self.__flocked:
+            yield
+            return
+        with open(self.__file_path + ".lock", 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            FileStorage.__flocked = True
+            try:
+                yield
+            finally:
+                FileStorage.__flocked = False
+
+    def __sync(self, f=None):
+        """Flushes the file f, or the directory of the JSON file, to disk
+        if HBNB_FILE_FSYNC is set"""
+        if not self.__fsync:
+            return
+        if f is not None:
+            f.flush()
+            os.fsync(f.fileno())
+        elif hasattr(os, "O_DIRECTORY"):
+            fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                         os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def __refresh(self):
+        """Reads the file again if another process wrote it since"""
+        if self.__stamp() != self.__file_stamp:
+            self.__read()
+
+    def __hydrate(self, objs):
+        """Turns the Unloaded values of the {key: obj} dictionary objs into
+        objects, everywhere they are stored, and returns objs"""
+        keys = [key for key, obj in objs.items() if type(obj) is Unloaded]
+        if not keys:
+            return objs
+        with self.__locked(shared=True):
+            if self.__file_stamp is None or \
+                    self.__stamp()[0] != self.__file_stamp[0]:
+                # another process rewrote the file, moving the records
+                self.__read()
+            unloaded = sorted((self.__objects[key].start, key) for key in keys
+                              if type(self.__objects.get(key)) is Unloaded)
+            with open(self.__file_path, 'rb') as f:
+                for start, key in unloaded:
+                    stub = self.__objects[key]
+                    f.seek(start)
+                    data = f.read(stub.end - start)
+                    obj = classes[stub.name].from_dict(
+                        self.__file_format.loads(data))
+                    if self.__file_format is self.__format:
+                        self.__serialized[key] = (obj, self.__fingerprint(obj),
+                                                  data)
+                    self.__objects[key] = obj
+                    self.__by_class[stub.name][key] = obj
+                    for attr, value in stub.attrs.items():
+                        children = self.__by_parent[(stub.name, attr)]
+                        for parent in self.__parents(value):
+                            children[parent][key] = obj
+        for key in keys:
+            if key in self.__objects:
+                objs[key] = self.__objects[key]
+            else:
+                del objs[key]
+        return objs
+
+    @synchronized
+    def all(self, cls=None, prefetch=None, strategy=None):
+        """returns the dictionary __objects; relationships are served from
+        the indexes, so there is nothing to prefetch"""
+        if cls is None:
+            if self.__lazy:
+                self.__index()
+                self.__hydrate(self.__objects)
+            return self.__objects
+        index = self.__index()
+        new_dict = {}
+        for name in self.__class_names(cls):
+            new_dict.update(index.get(name, {}))
+        return self.__hydrate(new_dict)
+
+    @synchronized
     def new(self, obj):
-        """Sets in __objects the obj with key <obj class name>.id"""
-        if obj:
-            key = f"{obj.__class__.__name__}.{obj.id}"
-            self.__objects[key] = obj
+        """sets in __objects the obj with key <obj class name>.id"""
+        if obj is not None:
+            self.__index()
+            key = obj.__class__.__name__ + "." + obj.id
+            old = self.__objects.get(key)
+            # update() already keeps the indexes of a stored object up
+            if old is None:
+                self.__objects[key] = obj
+                self.__add_to_index(key, obj)
+            elif old is not obj:
+                self.__objects[key] = obj
+                self.__replace_in_index(key, old, obj)
+            self.__changed.add(key)
+            self.__deleted.discard(key)
+            self.__bump([obj.__class__.__name__])
+
+    def __bump(self, names):
+        """Counts a change to the objects of each class of names"""
+        for name in names:
+            self.__generations[name] = self.__generations.get(name, 0) + 1
+
+    @synchronized
+    def generation(self, *clss):
+        """Returns a number that grows whenever objects of clss, or of any
+        class if none is given, are added, saved or deleted here or are
+        reloaded from the file, which is reloaded first if it changed on
+        disk, unless the reload policy is never"""
+        if self.__reload_policy != "never" and \
+                self.__stamp() != self.__file_stamp:
+            self.reload()
+        names = [cls if isinstance(cls, str) else cls.__name__
+                 for cls in clss] or list(self.__generations)
+        return sum(self.__generations.get(name, 0) for name in names)
+
+    def __fingerprint(self, obj):
+        """Returns a copy of the attributes of obj that tells apart the
+        changes made to its lists and dictionaries in place, which
+        __setattr__ never sees, at a fraction of the cost of dumps()"""
+        attrs = obj.__dict__.copy()
+        if not self.__mutable.isdisjoint(map(type, attrs.values())):
+            for attr, value in attrs.items():
+                if type(value) in self.__mutable:
+                    attrs[attr] = copy.copy(value)
+        return attrs
 
+    def __dump(self, key, obj):
+        """Returns obj serialized, serializing it again only if it changed,
+        through __setattr__ or in place"""
+        cached = self.__serialized.get(key)
+        fingerprint = self.__fingerprint(obj)
+        if cached is None or cached[0] is not obj or \
+                key in self.__changed or cached[1] != fingerprint:
+            cached = (obj, fingerprint,
+                      self.__format.dumps(obj.to_dict(False)))
+            self.__serialized[key] = cached
+            self.__changed.discard(key)
+        return cached[2]
+
+    @synchronized
     def save(self):
-        """Serializes __objects to the JSON file (path: __file_path)"""
-        with open(self.__file_path, 'w') as f:
-            json.dump({key: obj.to_dict(False) for key, obj in self.__objects.items()}, f)
+        """serializes __objects to the JSON file (path: __file_path)"""
+        with self.__locked():
+            self.__refresh()
+            self.__index()
+            self.__bump({key.partition(".")[0] for key in self.__changed})
+            fmt = self.__format
+            if not self.__journal or \
+                    self.__log_records >= self.__compact_at or \
+                    not os.path.exists(self.__file_path) or \
+                    self.__file_format is not fmt or \
+                    self.__log_format is not fmt:
+                self.__compact()
+                return
+            records = [fmt.log_record(key, fmt.dumps(None))
+                       for key in self.__deleted]
+            for key in list(self.__changed):
+                obj = self.__objects.get(key)
+                if obj is not None:
+                    records.append(fmt.log_record(key, self.__dump(key, obj)))
+            if records:
+                with open(self.__file_path + ".log", 'ab') as f:
+                    if f.tell() > self.__log_end:
+                        # drop what a crash left of a record, which the
+                        # next record would otherwise be read as part of
+                        f.truncate(self.__log_end)
+                        f.seek(self.__log_end)
+                    f.write(b"".join(records))
+                    self.__sync(f)
+                    FileStorage.__log_end = f.tell()
+            FileStorage.__log_records += len(records)
+            FileStorage.__file_stamp = self.__stamp()
+            self.__changed.clear()
+            self.__deleted.clear()
+
+    @synchronized
+    def compact(self):
+        """writes every object to the JSON file and empties the log"""
+        with self.__locked():
+            self.__refresh()
+            self.__compact()
+
+    def __compact(self):
+        """writes every object to a new file that then replaces the JSON
+        file, so that it is never left half written, and removes the log"""
+        fmt = self.__format
+        if self.__file_format is not fmt:
+            # records are copied as they are only between files of a format
+            self.__index()
+            self.__hydrate(self.__objects)
+        spans = []
+        old = None
+        with open(self.__file_path + ".tmp", 'wb') as f:
+            f.write(fmt.head(len(self.__objects)))
+            for i, (key, obj) in enumerate(self.__objects.items()):
+                f.write(fmt.item(i, key))
+                if type(obj) is Unloaded:
+                    # copy the record as it is in the current file
+                    if old is None:
+                        old = open(self.__file_path, 'rb')
+                    old.seek(obj.start)
+                    spans.append((obj, f.tell()))
+                    f.write(old.read(obj.end - obj.start))
+                else:
+                    f.write(self.__dump(key, obj))
+            f.write(fmt.tail())
+            self.__sync(f)
+        if old is not None:
+            old.close()
+        if os.path.exists(self.__file_path):
+            shutil.copymode(self.__file_path, self.__file_path + ".tmp")
+        os.replace(self.__file_path + ".tmp", self.__file_path)
+        for obj, start in spans:
+            obj.start, obj.end = start, start + obj.end - obj.start
+        if os.path.exists(self.__file_path + ".log"):
+            os.remove(self.__file_path + ".log")
+        self.__sync()
+        FileStorage.__log_records = FileStorage.__log_end = 0
+        FileStorage.__file_format = FileStorage.__log_format = fmt
+        FileStorage.__file_stamp = self.__stamp()
+        self.__changed.clear()
+        self.__deleted.clear()
 
+    def __keep(self, key):
+        """Tells if the object at key was changed or deleted since the last
+        save, and so is not to be replaced by what is on disk"""
+        return key in self.__deleted or key in self.__changed
+
+    def __load(self, key, record):
+        """puts a record read from disk into __objects, or removes key"""
+        if self.__keep(key):
+            return
+        if record is None:
+            obj = self.__objects.pop(key, None)
+            if obj is not None:
+                self.__remove_from_index(key, obj)
+            self.__serialized.pop(key, None)
+        else:
+            obj = classes[record["__class__"]].from_dict(record)
+            self.new(obj)
+            self.__changed.discard(key)
+
+    def __load_unloaded(self, key, record, start, end):
+        """puts an Unloaded for a record of the JSON file into __objects"""
+        if self.__keep(key):
+            return
+        name = record["__class__"]
+        attrs = {attr: record.get(attr)
+                 for attr in self.foreign_keys.get(name, ())}
+        if key in self.__objects:
+            self.__remove_from_index(key, self.__objects[key])
+        self.__objects[key] = Unloaded(name, start, end, attrs,
+                                       record.get("created_at"),
+                                       record.get("updated_at"))
+        self.__add_to_index(key, self.__objects[key])
+        self.__serialized.pop(key, None)
+
+    @synchronized
     def reload(self):
-        """Deserializes the JSON file to __objects"""
+        """deserializes the file, then replays its log, to __objects"""
+        with self.__locked(shared=True):
+            self.__read()
+
+    def __read(self):
+        """Makes __objects what the file and its log hold, but for the
+        objects changed or deleted since the last save"""
+        self.__index()
+        self.__bump(classes)
+        FileStorage.__file_stamp = self.__stamp()
+        # the objects saved before that another process has since deleted
+        gone = {key for key in self.__objects if key not in self.__changed}
         try:
-            with open(self.__file_path, 'r') as f:
-                obj_dict = json.load(f)
-            for key, value in obj_dict.items():
-                cls_name = value["__class__"]
-                self.__objects[key] = classes[cls_name](**value)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(self.__file_path, 'rb') as f:
+                fmt = detect(f, self.__format)
+                FileStorage.__file_format = fmt
+                if self.__lazy:
+                    for item in fmt.iter_items(f, offsets=True):
+                        gone.discard(item[0])
+                        self.__load_unloaded(*item)
+                else:
+                    for key, record in fmt.iter_items(f):
+                        gone.discard(key)
+                        self.__load(key, record)
+        except (FileNotFoundError, ValueError):
             pass
+        FileStorage.__log_records = FileStorage.__log_end = 0
+        try:
+            with open(self.__file_path + ".log", 'rb') as f:
+                fmt = detect(f, self.__format)
+                FileStorage.__log_format = fmt
+                for key, record, end in fmt.iter_log(f, offsets=True):
+                    gone.discard(key)
+                    self.__load(key, record)
+                    FileStorage.__log_records += 1
+                    FileStorage.__log_end = end
+        except FileNotFoundError:
+            pass
+        for key in gone:
+            self.__load(key, None)
 
+    @synchronized
     def delete(self, obj=None):
-        """Deletes obj from __objects if it’s inside"""
-        if obj:
-            key = f"{obj.__class__.__name__}.{obj.id}"
-            self.__objects.pop(key, None)
+        """delete obj from __objects if it's inside"""
+        if obj is not None:
+            self.__index()
+            key = obj.__class__.__name__ + '.' + obj.id
+            if key in self.__objects:
+                self.__remove_from_index(key, self.__objects.pop(key))
+                self.__serialized.pop(key, None)
+                self.__changed.discard(key)
+                self.__deleted.add(key)
+                self.__bump([obj.__class__.__name__])
+
+    @synchronized
+    def bulk_new(self, objs):
+        """Adds every object of objs, then saves them all at once"""
+        for obj in objs:
+            self.new(obj)
+        self.save()
+
+    @synchronized
+    def bulk_get(self, cls, ids):
+        """Returns the objects of cls whose id is in ids, by id, building
+        the lazily loaded ones in one pass over the file"""
+        if cls not in classes.values():
+            return {}
+        self.__index()
+        keys = {cls.__name__ + "." + id: id for id in ids
+                if isinstance(id, str)}
+        objs = self.__hydrate({key: self.__objects[key] for key in keys
+                               if key in self.__objects})
+        return {keys[key]: obj for key, obj in objs.items()}
+
+    @synchronized
+    def bulk_update(self, cls, rows):
+        """Sets on the object of cls of each dictionary of rows, found by
+        its id, the other attributes of the dictionary, then saves them
+        all at once; returns the objects, skipping the ids not found"""
+        found = self.bulk_get(cls, [row.get("id") for row in rows])
+        now = datetime.utcnow()
+        objs = []
+        for row in rows:
+            obj = found.get(row.get("id"))
+            if obj is None:
+                continue
+            for attr, value in row.items():
+                if attr not in ("id", "created_at", "updated_at",
+                                "__class__"):
+                    setattr(obj, attr, value)
+            obj.updated_at = now
+            objs.append(obj)
+        self.save()
+        return objs
+
+    @synchronized
+    def bulk_delete(self, objs):
+        """Deletes every object of objs, then saves at once"""
+        for obj in objs:
+            self.delete(obj)
+        self.save()
+
+    @synchronized
+    def update(self, obj, attr, old_value):
+        """Marks obj as changed if it is stored here, re-indexing it if its
+        foreign key attr, its created_at or an attribute it is sorted by
+        changed from old_value"""
+        self.__index()
+        key = self.__key(obj)
+        if self.__objects.get(key) is not obj:
+            return
+        self.__changed.add(key)
+        name = obj.__class__.__name__
+        if (name, attr) in self.__by_key:
+            self.__by_key[(name, attr)].add(key,
+                                            self.__sort_key_of(obj, attr))
+        if attr == "created_at":
+            self.__searches.clear()
+            self.__by_order[name].add(key, self.__order_of(obj))
+            for fk in self.foreign_keys.get(name, ()):
+                ordered = self.__by_parent_order.get((name, fk), {})
+                for parent in self.__parents(self.__attr_of(obj, fk)):
+                    ordered[parent].add(key, self.__order_of(obj))
+        elif attr in self.foreign_keys.get(name, ()):
+            self.__remove_from_index(key, obj, attr, old_value)
+            self.__add_to_index(key, obj, attr)
+
+    @synchronized
+    def is_changed(self, obj):
+        """Tells if obj is stored here and changed since the last save"""
+        key = self.__key(obj)
+        return key in self.__changed and self.__objects.get(key) is obj
+
+    @synchronized
+    def unsaved(self):
+        """Returns the objects save() would write"""
+        return [self.__objects[key] for key in self.__changed
+                if key in self.__objects]
+
+    @synchronized
+    def related(self, cls, attr, parent_id):
+        """Returns the list of cls objects whose attr equals parent_id"""
+        self.__index()
+        name = cls if isinstance(cls, str) else cls.__name__
+        if attr not in self.foreign_keys.get(name, ()):
+            return [obj for obj in self.all(cls).values()
+                    if getattr(obj, attr, None) == parent_id]
+        children = self.__by_parent.get((name, attr), {})
+        if parent_id not in children:
+            return []
+        return list(self.__hydrate(children[parent_id]).values())
 
+    def __ordered(self, keys):
+        """Returns a SortedIndex of keys by (created_at, id)"""
+        index = SortedIndex()
+        for key in keys:
+            index.add(key, self.__order_of(self.__objects[key]))
+        return index
+
+    def __paged(self, name, index, limit=None, after=None):
+        """Returns the objects of the keys of the SortedIndex index, which
+        are of the class name, in (created_at, id) order, starting past
+        after, a (created_at, id) pair, and up to limit of them"""
+        start = None if after is None else (after[0], name + "." + after[1])
+        keys = list(islice(index.iter_from(start), limit))
+        return list(self.__hydrate(
+            {key: self.__objects[key] for key in keys}).values())
+
+    @synchronized
+    def page(self, cls, limit=None, after=None, attr=None, parent_id=None,
+             columns=None):
+        """Returns up to limit objects of cls, only those whose attr is
+        parent_id if attr is given, in (created_at, id) order, starting
+        past after, a (created_at, id) pair; all their columns are there"""
+        self.__index()
+        name = cls if isinstance(cls, str) else cls.__name__
+        if attr is None:
+            index = self.__by_order.get(name, SortedIndex())
+        elif attr in self.foreign_keys.get(name, ()):
+            index = self.__by_parent_order.get((name, attr), {}).get(
+                parent_id, SortedIndex())
+        else:
+            index = self.__ordered(self.__keys_of(name, attr, parent_id))
+        return self.__paged(name, index, limit, after)
+
+    def __keys_of(self, name, attr=None, parent_id=None):
+        """Returns the keys of the objects of the class name whose attr is
+        parent_id, or None for all of them if attr is None"""
+        if attr in self.foreign_keys.get(name, ()):
+            return self.__by_parent.get((name, attr), {}).get(parent_id, {})
+        if attr is not None:
+            return [key for key, obj in self.all(name).items()
+                    if getattr(obj, attr, None) == parent_id]
+        return None
+
+    @synchronized
+    def all_sorted(self, cls, key="name", attr=None, parent_id=None):
+        """Returns the objects of cls, only those whose attr is parent_id
+        if attr is given, ordered by their attribute key then id; the
+        order of all of them is kept in an index from the first call on,
+        so later calls do not sort them again"""
+        self.__index()
+        name = cls if isinstance(cls, str) else cls.__name__
+        keys = self.__keys_of(name, attr, parent_id)
+        if keys is not None:
+            objs = self.__hydrate({k: self.__objects[k] for k in keys})
+            return sorted(objs.values(), key=lambda obj: (
+                self.__sort_key_of(obj, key), obj.id))
+        index = self.__by_key.get((name, key))
+        if index is None:
+            objs = self.__hydrate(dict(self.__by_class.get(name, {})))
+            index = SortedIndex()
+            for k, obj in objs.items():
+                index.add(k, self.__sort_key_of(obj, key))
+            self.__by_key[(name, key)] = index
+        return [self.__objects[k] for k in index]
+
+    @synchronized
+    def version(self, cls, id):
+        """Returns the updated_at of the object of cls with that id, or
+        None if there is none, without building the object"""
+        if cls not in classes.values() or not isinstance(id, str):
+            return None
+        obj = self.__objects.get(cls.__name__ + "." + id)
+        if obj is None:
+            return None
+        return datetime.strptime(self.__order_of(obj, "updated_at"),
+                                 TIME_FORMAT)
+
+    @synchronized
+    def collection_version(self, cls, attr=None, parent_id=None):
+        """Returns the number of objects of cls, only those whose attr is
+        parent_id if attr is given, and their latest updated_at, or None
+        if there are none, without building the objects"""
+        index = self.__index()
+        name = cls if isinstance(cls, str) else cls.__name__
+        keys = self.__keys_of(name, attr, parent_id)
+        if keys is None:
+            keys = index.get(name, {})
+        latest = max((self.__order_of(self.__objects[key], "updated_at")
+                      for key in keys), default=None)
+        if latest is not None:
+            latest = datetime.strptime(latest, TIME_FORMAT)
+        return len(keys), latest
+
+    @synchronized
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None, columns=None):
+        """Returns the places in the cities of states or in cities, or all
+        of them if both are empty, that have every amenity of amenities,
+        by intersecting the index entries of these ids, paged as page()
+        does; the places found are kept in order until objects change, so
+        the next pages do not search again"""
+        self.__index()
+        search = (frozenset(states or ()), frozenset(cities or ()),
+                  frozenset(amenities or ()))
+        index = self.__searches.get(search)
+        if index is None:
+            index = self.__ordered(self.__search(*search))
+            self.__searches[search] = index
+            if len(self.__searches) > 16:
+                self.__searches.popitem(last=False)
+        self.__searches.move_to_end(search)
+        return self.__paged("Place", index, limit, after)
+
+    def __search(self, states, cities, amenities):
+        """Returns the set of the keys of the places search_places()
+        finds"""
+        by_state = self.__by_parent.get(("City", "state_id"), {})
+        by_city = self.__by_parent.get(("Place", "city_id"), {})
+        by_amenity = self.__by_parent.get(("Place", "amenity_ids"), {})
+        with_amenities = sorted((by_amenity.get(id, {}) for id in
+                                 set(amenities or ())), key=len)
+        if states or cities:
+            city_ids = set(cities or ())
+            for state_id in states or ():
+                city_ids.update(key.partition(".")[2]
+                                for key in by_state.get(state_id, ()))
+            keys = set()
+            for city_id in city_ids:
+                keys.update(by_city.get(city_id, ()))
+        elif with_amenities:
+            keys = set(with_amenities.pop(0))
+        else:
+            keys = set(self.__by_class.get("Place", ()))
+        for places in with_amenities:
+            keys.intersection_update(places)
+        return keys
+
+    @synchronized
     def close(self):
-        """Call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method for deserializing the JSON file to objects,
+        unless the reload policy says otherwise"""
+        if self.__reload_policy == "always" or \
+                self.__reload_policy == "on-change" and \
+                self.__stamp() != self.__file_stamp:
+            self.reload()
 
-    def get(self, cls, id):
-        """Retrieves an object"""
+    @synchronized
+    def get(self, cls, id, prefetch=None, strategy=None):
+        """Returns the object based on the class and its ID, or None"""
         if cls in classes.values() and isinstance(id, str):
-            return self.__objects.get(f"{cls.__name__}.{id}")
+            key = cls.__name__ + "." + id
+            obj = self.__objects.get(key)
+            if type(obj) is Unloaded:
+                self.__index()
+                obj = self.__hydrate({key: obj})[key]
+            return obj
         return None
 
+    def detach(self, obj):
+        """Returns what attach() needs to find obj again"""
+        return obj
+
+    @synchronized
+    def attach(self, obj):
+        """Returns the object stored under the key of obj, which is obj
+        unless reload() replaced or dropped it"""
+        return self.get(type(obj), obj.id)
+
+    @synchronized
     def count(self, cls=None):
-        """Counts the number of objects"""
-        return len(self.all(cls))
+        """Returns the number of objects in storage matching the class"""
+        if cls is None:
+            return len(self.__objects)
+        index = self.__index()
+        return sum(len(index.get(name, {}))
+                   for name in self.__class_names(cls))
+
+    @synchronized
+    def stats(self):
+        """Returns the number of objects of each class, by class name"""
+        index = self.__index()
+        return {name: len(index.get(name, {})) for name in classes}
@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+"""
+Contains the serializers FileStorage can write its file with
+"""
+
+import io
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def iter_json_items(f, chunk_size=65536, offsets=False):
+    """Yields the (key, value) pairs of the JSON object in file f one at a
+    time, so only one value has to be held in memory as a whole; with
+    offsets, the pairs are followed by where the value starts and ends"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    base = 0
+    eof = False
+
+    def read():
+        """Drops the consumed part of buf and appends the next chunk"""
+        nonlocal buf, pos, base, eof
+        chunk = f.read(chunk_size)
+        base += pos
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+    def peek():
+        """Skips whitespace and returns the next character"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                raise json.JSONDecodeError("Unexpected end", buf, pos)
+            read()
+
+    def expect(char):
+        """Consumes char, the next non-whitespace character"""
+        nonlocal pos
+        if peek() != char:
+            raise json.JSONDecodeError("Expecting " + repr(char), buf, pos)
+        pos += 1
+
+    def value():
+        """Decodes the JSON value that starts at the next character"""
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read()
+                continue
+            # a number is only whole once something it cannot go on with
+            # follows it, as 12 could be the start of 12.5e3
+            if eof or type(obj) not in (int, float) or \
+                    buf[end:].strip("0123456789.eE+-"):
+                pos = end
+                return obj
+            read()
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        key = value()
+        if type(key) is not str:
+            raise json.JSONDecodeError("Expecting property name", buf, pos)
+        expect(":")
+        start = base + pos
+        item = value()
+        if offsets:
+            yield key, item, start, base + pos
+        else:
+            yield key, item
+        if peek() == "}":
+            return
+        expect(",")
+
+
+class JSONSerializer:
+    """Writes the file as one JSON object and its log as JSON lines"""
+    name = "json"
+
+    def dumps(self, obj):
+        """Returns obj serialized, as bytes"""
+        return json.dumps(obj).encode()
+
+    def loads(self, data):
+        """Returns the value serialized in the bytes data"""
+        return json.loads(data)
+
+    def head(self, count):
+        """Returns what starts a file of count items"""
+        return b"{"
+
+    def item(self, i, key):
+        """Returns what comes before the data of the i-th item, key"""
+        return (b", " if i else b"") + self.dumps(key) + b": "
+
+    def tail(self):
+        """Returns what ends a file"""
+        return b"}"
+
+    def iter_items(self, f, offsets=False):
+        """Yields the items of the binary file f as iter_json_items does;
+        with offsets, strings are only decoded well enough to be compared
+        with ASCII ones, as each byte is read as one character"""
+        if offsets:
+            text = io.TextIOWrapper(f, encoding="latin-1", newline="")
+        else:
+            text = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            yield from iter_json_items(text, offsets=offsets)
+        finally:
+            text.detach()
+
+    def log_record(self, key, data):
+        """Returns the log entry setting key to the serialized data"""
+        return b"[" + self.dumps(key) + b", " + data + b"]\n"
+
+    def iter_log(self, f, offsets=False):
+        """Yields the (key, value) entries of the binary log file f, with
+        offsets followed by where the entry ends"""
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                # an entry cut short by a crash
+                return
+            end += len(line)
+            try:
+                key, record = self.loads(line)
+            except ValueError:
+                continue
+            if offsets:
+                yield key, record, end
+            else:
+                yield key, record
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Writes the same JSON as JSONSerializer, with orjson"""
+    name = "orjson"
+
+    def dumps(self, obj):
+        """Returns obj serialized, as bytes"""
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        """Returns the value serialized in the bytes data"""
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """Writes the file as one MessagePack map and its log as a sequence of
+    MessagePack [key, value] arrays"""
+    name = "msgpack"
+
+    def dumps(self, obj):
+        """Returns obj serialized, as bytes"""
+        return msgpack.packb(obj)
+
+    def loads(self, data):
+        """Returns the value serialized in the bytes data"""
+        return msgpack.unpackb(data)
+
+    def head(self, count):
+        """Returns what starts a file of count items"""
+        return msgpack.Packer().pack_map_header(count)
+
+    def item(self, i, key):
+        """Returns what comes before the data of the i-th item, key"""
+        return self.dumps(key)
+
+    def tail(self):
+        """Returns what ends a file"""
+        return b""
+
+    def iter_items(self, f, offsets=False):
+        """Yields the (key, value) items of the binary file f, with offsets
+        followed by where the value starts and ends"""
+        unpacker = msgpack.Unpacker(f)
+        for i in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            start = unpacker.tell()
+            value = unpacker.unpack()
+            if offsets:
+                yield key, value, start, unpacker.tell()
+            else:
+                yield key, value
+
+    def log_record(self, key, data):
+        """Returns the log entry setting key to the serialized data"""
+        return msgpack.Packer().pack_array_header(2) + self.dumps(key) + data
+
+    def iter_log(self, f, offsets=False):
+        """Yields the (key, value) entries of the binary log file f, with
+        offsets followed by where the entry ends; an entry cut short by a
+        crash ends the log"""
+        unpacker = msgpack.Unpacker(f)
+        for key, record in unpacker:
+            if offsets:
+                yield key, record, unpacker.tell()
+            else:
+                yield key, record
+
+
+serializers = {"json": JSONSerializer()}
+if orjson is not None:
+    serializers["orjson"] = OrjsonSerializer()
+if msgpack is not None:
+    serializers["msgpack"] = MsgpackSerializer()
+
+
+def get_serializer(name):
+    """Returns the serializer called name, or the json one if the module it
+    needs is not installed"""
+    return serializers.get(name, serializers["json"])
+
+
+def detect(f, default):
+    """Returns the serializer that wrote the binary file f, judging by its
+    first byte, or default if f is empty; f is left at its start"""
+    first = f.read(64).lstrip(b" \t\n\r")[:1]
+    f.seek(0)
+    if not first:
+        return default
+    if first in b"{[":
+        return default if isinstance(default, JSONSerializer) \
+            else serializers["json"]
+    if msgpack is None:
+        raise ImportError("msgpack is needed to read " + repr(f.name))
+    return serializers["msgpack"]
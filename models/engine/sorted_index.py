@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Contains the SortedIndex class
+"""
+
+from bisect import bisect_right
+
+
+class SortedIndex:
+    """Keeps keys in the order of a sort key given with each of them,
+    sorting them again only when they are iterated after changes that
+    did not keep them in order"""
+
+    def __init__(self):
+        """Starts empty"""
+        # dictionary - key -> sort key
+        self.__sort_keys = {}
+        # list - the (sort key, key) pairs in order, or None to sort again
+        self.__entries = []
+        # set - (sort key, key) pairs of __entries no longer in the index
+        self.__stale = set()
+
+    def __len__(self):
+        """Returns the number of keys"""
+        return len(self.__sort_keys)
+
+    def __contains__(self, key):
+        """Tells if key is in the index"""
+        return key in self.__sort_keys
+
+    def sort_key(self, key):
+        """Returns the sort key key was added with"""
+        return self.__sort_keys[key]
+
+    def add(self, key, sort_key):
+        """Adds key, or moves it, to where sort_key puts it"""
+        if key in self.__sort_keys:
+            if self.__sort_keys[key] == sort_key:
+                return
+            self.remove(key)
+        self.__sort_keys[key] = sort_key
+        entry = (sort_key, key)
+        if self.__entries is None:
+            return
+        if not self.__entries or entry > self.__entries[-1]:
+            self.__entries.append(entry)
+        else:
+            self.__entries = None
+
+    def remove(self, key):
+        """Removes key if it is in the index"""
+        if key not in self.__sort_keys:
+            return
+        entry = (self.__sort_keys.pop(key), key)
+        if self.__entries is None:
+            return
+        self.__stale.add(entry)
+        if len(self.__stale) > len(self.__entries) // 2:
+            self.__entries = None
+
+    def __sorted(self):
+        """Returns the (sort key, key) pairs in order"""
+        if self.__entries is None:
+            self.__entries = sorted((sort_key, key) for key, sort_key
+                                    in self.__sort_keys.items())
+            self.__stale.clear()
+        return self.__entries
+
+    def __iter__(self):
+        """Yields the keys in order"""
+        return self.iter_from()
+
+    def iter_from(self, after=None):
+        """Yields the keys in order, starting past the (sort key, key)
+        pair after"""
+        entries = self.__sorted()
+        start = 0 if after is None else bisect_right(entries, after)
+        for i in range(start, len(entries)):
+            if entries is not self.__entries:
+                raise RuntimeError("SortedIndex changed during iteration")
+            if entries[i] not in self.__stale:
+                yield entries[i][1]
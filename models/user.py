@@ -1,26 +1,16 @@
 #!/usr/bin/python3
-<<<<<<< HEAD
 """Defines the User class"""
-=======
-""" holds class User"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
 import models
 from models.base_model import BaseModel, Base
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
-<<<<<<< HEAD
 import hashlib
 
-class User(BaseModel, Base):
-    """User class representing a user entity"""
-=======
-
 
 class User(BaseModel, Base):
-    """Representation of a user """
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+    """User class representing a user entity"""
     if models.storage_t == 'db':
         __tablename__ = 'users'
         email = Column(String(128), nullable=False)
@@ -36,7 +26,6 @@ class User(BaseModel, Base):
         last_name = ""
 
     def __init__(self, *args, **kwargs):
-<<<<<<< HEAD
         """Initializes a new user instance"""
         super().__init__(*args, **kwargs)
 
@@ -45,7 +34,3 @@ class User(BaseModel, Base):
         if key == "password":
             value = hashlib.md5(value.encode()).hexdigest()
         super().__setattr__(key, value)
-=======
-        """initializes user"""
-        super().__init__(*args, **kwargs)
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
@@ -138,6 +138,16 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_from_dict(self):
+        """Test that from_dict rebuilds an equal instance from to_dict"""
+        bm = BaseModel()
+        bm.name = "Holberton"
+        new_bm = BaseModel.from_dict(bm.to_dict())
+        self.assertIs(type(new_bm), BaseModel)
+        self.assertIsNot(new_bm, bm)
+        self.assertEqual(new_bm.__dict__, bm.__dict__)
+        self.assertFalse(new_bm.is_changed)
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""
+Contains the TestCachedStorageDocs and TestCachedStorage classes
+"""
+
+import inspect
+import models
+from models.engine import cached_storage
+from models.engine.cached_storage import CachedStorage
+from models.engine.file_storage import FileStorage
+from models.state import State
+import os
+import pep8
+import shutil
+import tempfile
+import time
+import unittest
+
+
+class TestCachedStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of CachedStorage"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = inspect.getmembers(CachedStorage, inspect.isfunction)
+
+    def test_pep8_conformance_cached_storage(self):
+        """Test that models/engine/cached_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cached_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_cached_storage(self):
+        """Test tests/test_models/test_engine/test_cached_storage.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_cached_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cached_storage_module_docstring(self):
+        """Test for the cached_storage.py module docstring"""
+        self.assertIsNot(cached_storage.__doc__, None,
+                         "cached_storage.py needs a docstring")
+        self.assertTrue(len(cached_storage.__doc__) >= 1,
+                        "cached_storage.py needs a docstring")
+
+    def test_cached_storage_class_docstring(self):
+        """Test for the CachedStorage class docstring"""
+        self.assertIsNot(CachedStorage.__doc__, None,
+                         "CachedStorage class needs a docstring")
+        self.assertTrue(len(CachedStorage.__doc__) >= 1,
+                        "CachedStorage class needs a docstring")
+
+    def test_cached_storage_func_docstrings(self):
+        """Test for the presence of docstrings in CachedStorage methods"""
+        for func in self.funcs:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestCachedStorage(unittest.TestCase):
+    """Test the CachedStorage class in front of FileStorage"""
+    def setUp(self):
+        """Gives each test an empty FileStorage, saved to a file of its own
+        so the tests leave file.json as it is"""
+        self.save = FileStorage._FileStorage__objects
+        self.file_path = FileStorage._FileStorage__file_path
+        self.dir = tempfile.mkdtemp()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = os.path.join(self.dir,
+                                                           "file.json")
+        self.states = [State(name="State {}".format(i)) for i in range(4)]
+        for state in self.states:
+            FileStorage().new(state)
+
+    def tearDown(self):
+        """Puts the objects and the file of FileStorage back"""
+        FileStorage._FileStorage__objects = self.save
+        FileStorage._FileStorage__file_path = self.file_path
+        shutil.rmtree(self.dir)
+
+    def test_get(self):
+        """Test that get counts hits and misses and finds the objects"""
+        storage = CachedStorage(FileStorage())
+        state = self.states[0]
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIsNone(storage.get(State, "missing"))
+        stats = storage.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]),
+                         (1, 2, 1))
+        self.assertEqual(storage.count(State), 4)
+
+    def test_eviction(self):
+        """Test that the least recently used entries are evicted"""
+        storage = CachedStorage(FileStorage(), max_entries=2)
+        for state in self.states[:3]:
+            storage.get(State, state.id)
+        storage.get(State, self.states[2].id)
+        storage.get(State, self.states[0].id)
+        storage.get(State, self.states[2].id)
+        stats = storage.cache_stats()
+        self.assertEqual((stats["hits"], stats["evictions"]), (2, 2))
+        size = stats["bytes"] // 2
+        storage = CachedStorage(FileStorage(), max_bytes=size * 3 // 2)
+        for state in self.states:
+            storage.get(State, state.id)
+        stats = storage.cache_stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertLessEqual(stats["bytes"], size * 3 // 2)
+
+    def test_ttl(self):
+        """Test that entries expire after ttl seconds"""
+        storage = CachedStorage(FileStorage(), ttl=0.05)
+        storage.get(State, self.states[0].id)
+        time.sleep(0.1)
+        storage.get(State, self.states[0].id)
+        self.assertEqual(storage.cache_stats()["hits"], 0)
+
+    def test_invalidation(self):
+        """Test that new, save, delete and reload drop cached objects"""
+        storage = CachedStorage(FileStorage())
+        state = self.states[0]
+        storage.get(State, state.id)
+        state.name = "Renamed"
+        storage.save()
+        self.assertEqual(storage.cache_stats()["entries"], 0)
+        storage.get(State, state.id)
+        storage.delete(state)
+        self.assertIsNone(storage.get(State, state.id))
+        other = State(id=state.id)
+        storage.new(other)
+        self.assertIs(storage.get(State, state.id), other)
@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models.engine import db_storage
+from models.engine.cached_storage import CachedStorage
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -14,16 +15,15 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-<<<<<<< HEAD
+from collections.abc import Mapping
+import gc
 import pep8
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+import threading
 import unittest
 
-=======
-import json
-import os
-import pep8
-import unittest
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -31,10 +31,7 @@ classes = {"Amenity": Amenity, "City": City, "Place": Place,
 
 class TestDBStorageDocs(unittest.TestCase):
     """Tests to check the documentation and style of DBStorage class"""
-<<<<<<< HEAD
 
-=======
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
     @classmethod
     def setUpClass(cls):
         """Set up for the doc tests"""
@@ -50,12 +47,8 @@ class TestDBStorageDocs(unittest.TestCase):
     def test_pep8_conformance_test_db_storage(self):
         """Test tests/test_models/test_db_storage.py conforms to PEP8."""
         pep8s = pep8.StyleGuide(quiet=True)
-<<<<<<< HEAD
-        result = pep8s.check_files(['tests/test_models/test_engine/test_db_storage.py'])
-=======
         result = pep8s.check_files(['tests/test_models/test_engine/\
 test_db_storage.py'])
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
         self.assertEqual(result.total_errors, 0,
                          "Found code style errors (and warnings).")
 
@@ -84,17 +77,11 @@ test_db_storage.py'])
 
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
-<<<<<<< HEAD
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_all_returns_dict(self):
-        """Test that all returns a dictionary"""
-=======
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
-    def test_all_returns_dict(self):
-        """Test that all returns a dictionaty"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
-        self.assertIs(type(models.storage.all()), dict)
+        """Test that all returns a mapping"""
+        self.assertIsInstance(models.storage.all(), Mapping)
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_all_no_class(self):
@@ -102,7 +89,6 @@ class TestFileStorage(unittest.TestCase):
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_new(self):
-<<<<<<< HEAD
         """Test that new adds an object to the database"""
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
@@ -112,14 +98,452 @@ class TestFileStorage(unittest.TestCase):
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_get(self):
         """Test that get retrieves an item in db properly"""
+        state = State(name="California")
+        models.storage.new(state)
+        models.storage.save()
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIsNone(models.storage.get(City, state.id))
+        self.assertIsNone(models.storage.get(State, "missing"))
+        models.storage.delete(state)
+        models.storage.save()
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_count(self):
-        """Verify that count accurately returns the number of elements in the database"""
-=======
-        """test that new adds an object to the database"""
+        """Verify that count accurately returns the number of elements in
+        the database"""
 
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
-    def test_save(self):
-        """Test that save properly saves objects to file.json"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+    def test_stats(self):
+        """Test that stats counts the rows of every table at once"""
+        stats = models.storage.stats()
+        self.assertEqual(set(stats), set(classes))
+        state = State(name="California")
+        models.storage.new(state)
+        models.storage.save()
+        self.assertEqual(models.storage.stats()["State"], stats["State"] + 1)
+        self.assertEqual(models.storage.count(State), stats["State"] + 1)
+        self.assertEqual(models.storage.count(), sum(stats.values()) + 1)
+        models.storage.delete(state)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_stats_ttl(self):
+        """Test that each commit, and no rollback, keeps the cached counters
+        up, and that count(cls) counts one table"""
+        save = DBStorage._DBStorage__stats_ttl
+        DBStorage._DBStorage__stats_ttl = 3600
+        try:
+            stats = models.storage.stats()
+            state = State(name="California")
+            models.storage.new(state)
+            models.storage.new(state)
+            self.assertEqual(models.storage.stats(), stats)
+            models.storage.save()
+            self.assertEqual(models.storage.stats()["State"],
+                             stats["State"] + 1)
+            models.storage.new(State(name="Nevada"))
+            self.assertEqual(models.storage.count(State), stats["State"] + 1)
+            models.storage._DBStorage__session.flush()
+            models.storage._DBStorage__session.rollback()
+            self.assertEqual(models.storage.count(State), stats["State"] + 1)
+            models.storage.delete(state)
+            models.storage.delete(state)
+            models.storage.save()
+            self.assertEqual(models.storage.stats(), stats)
+        finally:
+            DBStorage._DBStorage__stats_ttl = save
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def record(*args):
+            """Records the statements sent to the database"""
+            statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            models.storage.count(State)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("cities", statements[0])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_status(self):
+        """Test that pool_status reports the connection pool"""
+        status = models.storage.pool_status()
+        self.assertEqual(set(status), {"size", "checked_in", "checked_out",
+                                       "overflow", "waits", "wait_time"})
+        self.assertGreaterEqual(status["checked_out"], 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_save_unmapped(self):
+        """Test that save commits while unmapped BaseModels are alive"""
+        base = BaseModel()
+        base.name = "Unmapped"
+        state = State(name="California")
+        state.save()
+        self.assertFalse(state.is_changed)
+        self.assertFalse(base.is_changed)
+        state.name = "Nevada"
+        self.assertTrue(state.is_changed)
+        self.assertEqual(models.storage.unsaved(), [state])
+        models.storage.save()
+        models.storage.delete(state)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_save_flushed(self):
+        """Test that save commits the changes a query already flushed"""
+        state = State(name="California")
+        models.storage.new(state)
+        models.storage.count(State)
+        self.assertTrue(state.is_changed)
+        self.assertEqual(models.storage.unsaved(), [state])
+        models.storage.save()
+        self.assertFalse(state.is_changed)
+        models.storage.close()
+        found = models.storage.get(State, state.id)
+        self.assertEqual(found.name, "California")
+        models.storage.delete(found)
+        models.storage.count(State)
+        self.assertEqual(models.storage.unsaved(), [])
+        models.storage.save()
+        models.storage.close()
+        self.assertIsNone(models.storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_session_per_thread(self):
+        """Test that each thread has its own session, closed by close"""
+        state = State(name="California")
+        models.storage.new(state)
+        found = []
+
+        def work():
+            """Looks the state up from another thread"""
+            found.append(models.storage.get(State, state.id))
+            models.storage.close()
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        self.assertEqual(found, [None])
+        self.assertIs(models.storage.get(State, state.id), state)
+        models.storage.close()
+        self.assertIsNone(models.storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_prefetch(self):
+        """Test that prefetch loads relationships in a bounded number of
+        queries, however many objects there are"""
+        user = User(email="a@b.c", password="pwd")
+        objs = [user]
+        for i in range(3):
+            state = State(name="State {}".format(i))
+            objs.append(state)
+            for j in range(3):
+                city = City(name="City {}".format(j), state_id=state.id)
+                objs.append(city)
+                objs.append(Place(name="Place", city_id=city.id,
+                                  user_id=user.id))
+        for obj in objs:
+            models.storage.new(obj)
+        models.storage.save()
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def count(*args):
+            """Counts the statements sent to the database"""
+            statements.append(args[2])
+        for prefetch, strategy, queries in ((["cities.places"], "selectin", 3),
+                                            (["cities"], "joined", 1)):
+            models.storage.close()
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                for state in models.storage.all(State, prefetch=prefetch,
+                                                strategy=strategy).values():
+                    for city in state.cities:
+                        if strategy == "selectin":
+                            city.places
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            self.assertEqual(len(statements), queries)
+        models.storage.close()
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            state = models.storage.get(State, objs[1].id,
+                                       prefetch=["cities.places"])
+            self.assertEqual(len([place for city in state.cities
+                                  for place in city.places]), 3)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(len(statements), 3)
+        for obj in reversed(objs):
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_places(self):
+        """Test that search_places filters places in one query"""
+        user = User(email="a@b.c", password="pwd")
+        state = State(name="California")
+        cities = [City(name="San Jose", state_id=state.id),
+                  City(name="Fremont", state_id=state.id)]
+        wifi = Amenity(name="Wifi")
+        places = [Place(name="Place", city_id=city.id, user_id=user.id)
+                  for city in cities]
+        places[0].amenities.append(wifi)
+        objs = [user, state, wifi] + cities + places
+        for obj in objs:
+            models.storage.new(obj)
+        models.storage.save()
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def count(*args):
+            """Counts the statements sent to the database"""
+            statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            found = models.storage.search_places(states=[state.id],
+                                                 amenities=[wifi.id])
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(found, [places[0]])
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(
+            sorted(place.id for place in models.storage.search_places(
+                cities=[cities[1].id], states=[state.id])),
+            sorted(place.id for place in places))
+        for obj in reversed(objs):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_page(self):
+        """Test that page walks the rows in (created_at, id) order, one
+        query a page"""
+        state = State(name="California")
+        cities = [City(name="City {}".format(i), state_id=state.id)
+                  for i in range(5)]
+        cities[3].created_at = datetime(2000, 1, 1)
+        for obj in [state] + cities:
+            models.storage.new(obj)
+        models.storage.save()
+        ordered = sorted(cities, key=lambda city: (city.created_at, city.id))
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def count(*args):
+            """Counts the statements sent to the database"""
+            statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", count)
+        found, after = [], None
+        try:
+            while True:
+                page = models.storage.page(City, 2, after, attr="state_id",
+                                           parent_id=state.id,
+                                           columns=["name"])
+                found += page
+                if len(page) < 2:
+                    break
+                after = (page[-1].created_at.strftime(
+                    "%Y-%m-%dT%H:%M:%S.%f"), page[-1].id)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(found, ordered)
+        self.assertEqual(len(statements), 3)
+        for obj in reversed([state] + cities):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_microseconds(self):
+        """Test that MySQL keeps the microseconds of created_at and
+        updated_at, which versions and cursors compare"""
+        ddl = str(CreateTable(State.__table__).compile(
+            dialect=mysql.dialect()))
+        self.assertIn("created_at DATETIME(6)", ddl)
+        self.assertIn("updated_at DATETIME(6)", ddl)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_version(self):
+        """Test that version and collection_version report updated_at"""
+        state = State(name="California")
+        cities = [City(name="City {}".format(i), state_id=state.id)
+                  for i in range(3)]
+        cities[1].updated_at = datetime(2100, 1, 1)
+        for obj in [state] + cities:
+            models.storage.new(obj)
+        models.storage.save()
+        self.assertEqual(models.storage.version(State, state.id),
+                         state.updated_at)
+        self.assertIsNone(models.storage.version(State, cities[0].id))
+        self.assertEqual(models.storage.collection_version(
+            City, attr="state_id", parent_id=state.id),
+            (3, datetime(2100, 1, 1)))
+        self.assertEqual(models.storage.collection_version(
+            City, attr="state_id", parent_id="missing"), (0, None))
+        for obj in reversed([state] + cities):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_sorted(self):
+        """Test that all_sorted orders rows by name"""
+        state = State(name="Nevada")
+        cities = [City(name=name, state_id=state.id)
+                  for name in ("Reno", "Elko", "Carson City")]
+        for obj in [state] + cities:
+            models.storage.new(obj)
+        models.storage.save()
+        found = models.storage.all_sorted(City, "name", attr="state_id",
+                                          parent_id=state.id)
+        self.assertEqual([city.name for city in found],
+                         ["Carson City", "Elko", "Reno"])
+        names = [obj.name for obj in models.storage.all_sorted("State")]
+        self.assertEqual(names, sorted(names))
+        for obj in reversed([state] + cities):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_generation(self):
+        """Test that generation changes when rows of a class change, here
+        or through another connection"""
+        storage = models.storage
+        state = State(name="California")
+        before = storage.generation("State")
+        cities = storage.generation(City)
+        storage.new(state)
+        storage.save()
+        self.assertNotEqual(storage.generation("State"), before)
+        self.assertEqual(storage.generation(City), cities)
+        before = storage.generation(State, City)
+        state.name = "Nevada"
+        storage.save()
+        self.assertNotEqual(storage.generation(State, City), before)
+        before = storage.generation()
+        storage.delete(state)
+        storage.save()
+        self.assertNotEqual(storage.generation(), before)
+        self.assertEqual(storage.generation(City), cities)
+        before = storage.generation(State)
+        other = State(name="Utah")
+        with storage._DBStorage__engine.begin() as connection:
+            connection.execute(State.__table__.insert().values(
+                id=other.id, name=other.name, created_at=other.created_at,
+                updated_at=other.updated_at))
+        self.assertNotEqual(storage.generation(State), before)
+        self.assertEqual(storage.generation(City), cities)
+        before = storage.generation(State)
+        with storage._DBStorage__engine.begin() as connection:
+            connection.execute(State.__table__.delete().where(
+                State.__table__.c.id == other.id))
+        self.assertNotEqual(storage.generation(State), before)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_cached_get(self):
+        """Test that CachedStorage answers get() without a query, in the
+        session of each thread"""
+        storage = CachedStorage(models.storage)
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        storage.get(State, state.id)
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def count(*args):
+            """Counts the statements sent to the database"""
+            statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", count)
+        found = []
+        try:
+            thread = threading.Thread(target=lambda: found.append(
+                storage.get(State, state.id).name))
+            thread.start()
+            thread.join()
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(found, ["California"])
+        self.assertEqual(len(statements), 0)
+        state.name = "Nevada"
+        storage.save()
+        self.assertEqual(storage.cache_stats()["entries"], 0)
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_cached_get_unsaved(self):
+        """Test that CachedStorage keeps the changes not yet committed in
+        the session, and skips the cache while there are any"""
+        storage = CachedStorage(models.storage)
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        storage.get(State, state.id)
+        state.name = "Nevada"
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(state.name, "Nevada")
+        storage.save()
+        storage.get(State, state.id)
+        storage.close()
+        other = State(name="Utah")
+        storage.new(other)
+        found = storage.get(State, state.id)
+        self.assertEqual(found.name, "Nevada")
+        self.assertIn(found, models.storage._DBStorage__session.identity_map
+                      .values())
+        self.assertEqual(storage.cache_stats()["hits"], 2)
+        storage.delete(other)
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk(self):
+        """Test that bulk_new, bulk_update and bulk_delete commit once"""
+        storage = models.storage
+        states = [State(name="State {}".format(i)) for i in range(5)]
+        engine = storage._DBStorage__engine
+        commits = []
+
+        def count(*args):
+            """Counts the transactions committed"""
+            commits.append(1)
+        event.listen(engine, "commit", count)
+        try:
+            storage.bulk_new(states)
+            updated = storage.bulk_update(State, [
+                {"id": state.id, "name": "Nevada"} for state in states[:3]
+            ] + [{"id": "missing", "name": "Utah"}], chunk_size=2)
+        finally:
+            event.remove(engine, "commit", count)
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(updated, states[:3])
+        found = storage.bulk_get(State, [state.id for state in states],
+                                 chunk_size=2)
+        self.assertEqual(sorted(state.name for state in found.values()),
+                         ["Nevada"] * 3 + ["State 3", "State 4"])
+        storage.bulk_delete(states)
+        self.assertEqual(storage.bulk_get(State, list(found)), {})
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_cls(self):
+        """Test that all(cls) pages and projects the rows of one class"""
+        for i in range(3):
+            models.storage.new(State(name="State {}".format(i)))
+        models.storage.save()
+        gc.collect()
+        ids = sorted(id[6:] for id in models.storage.all(State))
+        self.assertEqual(len(models.storage.all(State)), len(ids))
+        self.assertEqual(models.storage.all(State)["State." + ids[0]].id,
+                         ids[0])
+        self.assertNotIn("City." + ids[0], models.storage.all(State))
+        page = models.storage.all(State, limit=2, offset=1)
+        self.assertEqual(len(page), 2)
+        self.assertEqual(list(page), ["State." + id for id in ids[1:3]])
+        for obj in models.storage.all(State, columns=["name"]).values():
+            self.assertIn("name", obj.__dict__)
+            self.assertNotIn("created_at", obj.__dict__)
+            models.storage.delete(obj)
+        models.storage.save()
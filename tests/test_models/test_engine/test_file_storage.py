@@ -3,13 +3,11 @@
 Contains the TestFileStorageDocs classes
 """
 
-<<<<<<< HEAD
-=======
 from datetime import datetime
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
 import inspect
 import models
 from models.engine import file_storage
+from models.engine import serializers
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -18,15 +16,15 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
-<<<<<<< HEAD
-import pep8
-import unittest
-
-=======
 import os
 import pep8
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -34,10 +32,7 @@ classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
 
 class TestFileStorageDocs(unittest.TestCase):
     """Tests to check the documentation and style of FileStorage class"""
-<<<<<<< HEAD
 
-=======
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
     @classmethod
     def setUpClass(cls):
         """Set up for the doc tests"""
@@ -53,12 +48,8 @@ class TestFileStorageDocs(unittest.TestCase):
     def test_pep8_conformance_test_file_storage(self):
         """Test tests/test_models/test_file_storage.py conforms to PEP8."""
         pep8s = pep8.StyleGuide(quiet=True)
-<<<<<<< HEAD
-        result = pep8s.check_files(['tests/test_models/test_engine/test_file_storage.py'])
-=======
         result = pep8s.check_files(['tests/test_models/test_engine/\
 test_file_storage.py'])
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
         self.assertEqual(result.total_errors, 0,
                          "Found code style errors (and warnings).")
 
@@ -87,16 +78,24 @@ test_file_storage.py'])
 
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
-<<<<<<< HEAD
+    def setUp(self):
+        """Points FileStorage at a copy of its file in a directory of its
+        own, so the tests leave file.json as it is"""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "file.json")
+        self.file_path = FileStorage._FileStorage__file_path
+        if os.path.exists(self.file_path):
+            shutil.copy(self.file_path, self.path)
+        FileStorage._FileStorage__file_path = self.path
+
+    def tearDown(self):
+        """Points FileStorage back at its file"""
+        FileStorage._FileStorage__file_path = self.file_path
+        shutil.rmtree(self.dir)
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_all_returns_dict(self):
         """Test that all returns the FileStorage.__objects attribute"""
-=======
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
-    def test_all_returns_dict(self):
-        """Test that all returns the FileStorage.__objects attr"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
         storage = FileStorage()
         new_dict = storage.all()
         self.assertEqual(type(new_dict), dict)
@@ -104,11 +103,7 @@ class TestFileStorage(unittest.TestCase):
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_new(self):
-<<<<<<< HEAD
-        """Test that new adds an object to the FileStorage.__objects attribute"""
-=======
-        """test that new adds an object to the FileStorage.__objects attr"""
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+        """Test that new adds an object to the FileStorage.__objects attr"""
         storage = FileStorage()
         save = FileStorage._FileStorage__objects
         FileStorage._FileStorage__objects = {}
@@ -138,17 +133,779 @@ class TestFileStorage(unittest.TestCase):
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
         string = json.dumps(new_dict)
-        with open("file.json", "r") as f:
+        with open(self.path, "r") as f:
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
-<<<<<<< HEAD
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_get(self):
         """Test that get retrieves objects stored in file.json"""
+        storage = FileStorage()
+        state = State(name="California")
+        storage.new(state)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIsNone(storage.get(City, state.id))
+        self.assertIsNone(storage.get(State, "missing"))
+        storage.delete(state)
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_count(self):
-        """Verify that count accurately returns the number of objects in file.json"""
-=======
->>>>>>> 0e0c3809a0163bc9e78f5689a9145452a504827f
+        """Verify that count returns the number of objects in storage"""
+        storage = FileStorage()
+        total = storage.count()
+        states = storage.count(State)
+        state = State(name="California")
+        storage.new(state)
+        self.assertEqual(storage.count(), total + 1)
+        self.assertEqual(storage.count(State), states + 1)
+        self.assertEqual(storage.count("State"), states + 1)
+        storage.delete(state)
+        self.assertEqual(storage.count(State), states)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_stats(self):
+        """Test that stats counts the objects of every class at once"""
+        storage = FileStorage()
+        stats = storage.stats()
+        self.assertEqual(set(stats), set(classes))
+        for name, cls in classes.items():
+            self.assertEqual(stats[name], storage.count(name))
+        state = State(name="California")
+        storage.new(state)
+        self.assertEqual(storage.stats()["State"], stats["State"] + 1)
+        storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls(self):
+        """Test that all(cls) only returns objects of that class"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        city = City()
+        storage.new(state)
+        storage.new(city)
+        self.assertEqual(storage.all(State),
+                         {"State." + state.id: state})
+        self.assertEqual(storage.all("City"), {"City." + city.id: city})
+        self.assertEqual(storage.all(State, prefetch=["cities"]),
+                         {"State." + state.id: state})
+        self.assertEqual(len(storage.all(BaseModel)), 2)
+        storage.delete(city)
+        self.assertEqual(storage.all(City), {})
+        FileStorage._FileStorage__objects = save
+        self.assertNotIn("State." + state.id, storage.all(State))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related(self):
+        """Test that related follows new, delete and foreign key updates"""
+        storage = FileStorage()
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(city)
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        self.assertEqual(state.cities, [city])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        storage.delete(city)
+        self.assertEqual(other.cities, [])
+        city.state_id = state.id
+        self.assertEqual(state.cities, [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places(self):
+        """Test that search_places filters places through the indexes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            state = State()
+            cities = [City(state_id=state.id), City(state_id=state.id),
+                      City()]
+            wifi = Amenity()
+            pool = Amenity()
+            places = [Place(city_id=city.id) for city in cities]
+            places[0].amenities = wifi
+            places[0].amenities = pool
+            places[2].amenities = wifi
+            for obj in [state, wifi, pool] + cities + places:
+                storage.new(obj)
+
+            def search(**kwargs):
+                """Returns the ids of the places found"""
+                return sorted(place.id for place in
+                              storage.search_places(**kwargs))
+            self.assertEqual(search(), sorted(p.id for p in places))
+            self.assertEqual(search(states=[state.id]),
+                             sorted(p.id for p in places[:2]))
+            self.assertEqual(search(states=[state.id], cities=[cities[2].id]),
+                             sorted(p.id for p in places))
+            self.assertEqual(search(amenities=[wifi.id]),
+                             sorted([places[0].id, places[2].id]))
+            self.assertEqual(search(states=[state.id],
+                                    amenities=[wifi.id, pool.id]),
+                             [places[0].id])
+            self.assertEqual(search(amenities=["missing"]), [])
+            self.assertEqual(search(states=[state.id], amenities=[wifi.id]),
+                             [places[0].id])
+            places[2].city_id = cities[0].id
+            self.assertEqual(search(states=[state.id], amenities=[wifi.id]),
+                             sorted([places[0].id, places[2].id]))
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page walks the objects in (created_at, id) order"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            state = State()
+            cities = [City(state_id=state.id) for i in range(5)]
+            cities[3].created_at = datetime(2000, 1, 1)
+            for obj in [state, City()] + cities:
+                storage.new(obj)
+            cities[0].created_at = datetime(2100, 1, 1)
+            ordered = sorted(cities, key=lambda city: (
+                city.created_at, city.id))
+            self.assertEqual(ordered[0], cities[3])
+            self.assertEqual(ordered[-1], cities[0])
+
+            def walk(limit, **kwargs):
+                """Returns the cities of every page of limit cities"""
+                found, after = [], None
+                while True:
+                    page = storage.page(City, limit, after, **kwargs)
+                    found += page
+                    if len(page) < limit:
+                        return found
+                    after = (page[-1].created_at.strftime(
+                        "%Y-%m-%dT%H:%M:%S.%f"), page[-1].id)
+            self.assertEqual(walk(2, attr="state_id", parent_id=state.id),
+                             ordered)
+            found = walk(3, attr="name", parent_id="")
+            self.assertEqual(len(found), 6)
+            self.assertEqual([city for city in found if city in cities],
+                             ordered)
+            self.assertEqual(walk(2), found)
+            self.assertEqual(storage.page(City, attr="state_id",
+                                          parent_id="missing"), [])
+            indexes = [FileStorage._FileStorage__by_order["City"],
+                       FileStorage._FileStorage__by_parent_order[
+                           ("City", "state_id")][state.id]]
+            for city in cities:
+                storage.new(city)
+            copy = City.from_dict(cities[1].to_dict(False))
+            storage.new(copy)
+            for index in indexes:
+                self.assertIsNotNone(index._SortedIndex__entries)
+                self.assertEqual(index._SortedIndex__stale, set())
+            self.assertIn(copy, walk(2, attr="state_id", parent_id=state.id))
+            storage.new(cities[1])
+            cities[3].state_id = "moved"
+            self.assertEqual(walk(2, attr="state_id", parent_id=state.id),
+                             ordered[1:])
+            self.assertEqual(storage.page(City, attr="state_id",
+                                          parent_id="moved"), [cities[3]])
+            self.assertEqual(storage.search_places(), [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_sorted(self):
+        """Test that all_sorted orders objects by name and keeps doing so
+        as they change"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            states = [State(name=name) for name in ("Nevada", "alaska",
+                                                    "Texas")]
+            for state in states:
+                storage.new(state)
+
+            def names(*args, **kwargs):
+                """Returns the names of the objects all_sorted returns"""
+                return [obj.name for obj in
+                        storage.all_sorted(*args, **kwargs)]
+            self.assertEqual(names(State), ["alaska", "Nevada", "Texas"])
+            states[2].name = "Arizona"
+            storage.new(State(name="Utah"))
+            storage.delete(states[1])
+            self.assertEqual(names("State", "name"),
+                             ["Arizona", "Nevada", "Utah"])
+            for name in ("Reno", "Elko"):
+                storage.new(City(name=name, state_id=states[0].id))
+            storage.new(City(name="Austin", state_id=states[2].id))
+            self.assertEqual(names(City, attr="state_id",
+                                   parent_id=states[0].id), ["Elko", "Reno"])
+            self.assertEqual(names(City), ["Austin", "Elko", "Reno"])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_generation(self):
+        """Test that generation grows when objects of a class change"""
+        storage = FileStorage()
+        state = State()
+        before = storage.generation("State")
+        cities = storage.generation(City)
+        everything = storage.generation()
+        storage.new(state)
+        self.assertGreater(storage.generation("State"), before)
+        self.assertGreater(storage.generation(), everything)
+        self.assertEqual(storage.generation(City), cities)
+        before = storage.generation(State, City)
+        state.name = "Renamed"
+        storage.save()
+        self.assertGreater(storage.generation(State, City), before)
+        before = storage.generation(State)
+        storage.delete(state)
+        self.assertGreater(storage.generation(State), before)
+        self.assertEqual(storage.generation(City), cities)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version(self):
+        """Test that version and collection_version report updated_at"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            state = State()
+            cities = [City(state_id=state.id) for i in range(3)]
+            for obj in [state] + cities:
+                storage.new(obj)
+            self.assertEqual(storage.version(State, state.id),
+                             state.updated_at)
+            self.assertIsNone(storage.version(State, cities[0].id))
+            self.assertIsNone(storage.version(BaseModel, state.id))
+            cities[1].updated_at = datetime(2100, 1, 1)
+            self.assertEqual(storage.collection_version(
+                City, attr="state_id", parent_id=state.id),
+                (3, datetime(2100, 1, 1)))
+            self.assertEqual(storage.collection_version(State),
+                             (1, state.updated_at))
+            self.assertEqual(storage.collection_version(
+                City, attr="state_id", parent_id="missing"), (0, None))
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk(self):
+        """Test that bulk_new, bulk_update and bulk_delete save once"""
+        storage = FileStorage()
+        saves = []
+        storage.save = lambda: (saves.append(1), FileStorage.save(storage))
+        states = [State(name="State {}".format(i)) for i in range(5)]
+        storage.bulk_new(states)
+        self.assertEqual(len(saves), 1)
+        with open(self.path, "r") as f:
+            js = json.load(f)
+        self.assertTrue(all("State." + state.id in js for state in states))
+        ids = [state.id for state in states[:2]] + ["missing", 1]
+        self.assertEqual(storage.bulk_get(State, ids),
+                         {state.id: state for state in states[:2]})
+        updated = storage.bulk_update(State, [
+            {"id": states[0].id, "name": "Nevada", "created_at": "x"},
+            {"id": "missing", "name": "Utah"}])
+        self.assertEqual(updated, [states[0]])
+        self.assertEqual(states[0].name, "Nevada")
+        self.assertIsInstance(states[0].created_at, datetime)
+        self.assertEqual(len(saves), 2)
+        storage.bulk_delete(states)
+        self.assertEqual(len(saves), 3)
+        self.assertEqual(storage.bulk_get(State, [states[0].id]), {})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_changed_only(self):
+        """Test that save only serializes objects changed since last save,
+        through __setattr__ or in place"""
+        storage = FileStorage()
+        place = Place(name="California", amenity_ids=[])
+        storage.new(place)
+        self.assertTrue(place.is_changed)
+        storage.save()
+        self.assertFalse(place.is_changed)
+        fmt = FileStorage._FileStorage__format
+        dumped = []
+
+        def dumps(obj):
+            """Counts the objects serialized, leaving the keys out"""
+            if isinstance(obj, dict):
+                dumped.append(obj)
+            return type(fmt).dumps(fmt, obj)
+        fmt.dumps = dumps
+        try:
+            storage.save()
+            self.assertEqual(dumped, [])
+            place.amenity_ids.append("Amenity")
+            storage.save()
+            self.assertEqual(len(dumped), 1)
+        finally:
+            del fmt.dumps
+        with open(self.path, "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["Place." + place.id]["amenity_ids"], ["Amenity"])
+        place.name = "Nevada"
+        self.assertTrue(place.is_changed)
+        storage.save()
+        with open(self.path, "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["Place." + place.id]["name"], "Nevada")
+        storage.delete(place)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_while_creating(self):
+        """Test that objects other threads create and change, which are not
+        stored, neither break nor join a save"""
+        storage = FileStorage()
+        state = State(name="California")
+        storage.new(state)
+        stop = threading.Event()
+        errors = []
+
+        def work():
+            """Creates and changes objects storage does not hold"""
+            try:
+                while not stop.is_set():
+                    for i in range(100):
+                        BaseModel().name = str(i)
+            except Exception as e:
+                errors.append(e)
+        thread = threading.Thread(target=work)
+        thread.start()
+        try:
+            for i in range(200):
+                state.name = str(i)
+                self.assertEqual(storage.unsaved(), [state])
+                storage.save()
+                self.assertFalse(state.is_changed)
+        finally:
+            stop.set()
+            thread.join()
+            storage.delete(state)
+            storage.save()
+        self.assertEqual(errors, [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_keeps_mode(self):
+        """Test that rewriting the file keeps its permissions"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__file_path = "test_mode.json"
+        try:
+            storage.compact()
+            os.chmod("test_mode.json", 0o640)
+            storage.compact()
+            self.assertEqual(os.stat("test_mode.json").st_mode & 0o777,
+                             0o640)
+        finally:
+            FileStorage._FileStorage__file_path = save
+            for path in ("test_mode.json", "test_mode.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload(self):
+        """Test that reload restores the objects saved to file.json"""
+        storage = FileStorage()
+        user = User(email="a@b.c", password="pwd")
+        storage.new(user)
+        storage.save()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        new_user = storage.get(User, user.id)
+        FileStorage._FileStorage__objects = save
+        self.assertIsNot(new_user, user)
+        self.assertEqual(new_user.to_dict(False), user.to_dict(False))
+        storage.delete(user)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(serializers.msgpack is None, "msgpack is not installed")
+    def test_format_migration(self):
+        """Test that reload reads either format and save writes the set one"""
+        storage = FileStorage()
+        formats = serializers.serializers
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__format,
+                FileStorage._FileStorage__journal,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_format.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            state = State(name="California")
+            storage.new(state)
+            FileStorage._FileStorage__format = formats["json"]
+            storage.save()
+            FileStorage._FileStorage__format = formats["msgpack"]
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name, "California")
+            storage.get(State, state.id).name = "Nevada"
+            storage.save()
+            with open("test_format.json", "rb") as f:
+                self.assertEqual(f.read(1), b"\x81")
+            storage.new(City())
+            storage.save()
+            self.assertTrue(os.path.exists("test_format.json.log"))
+            FileStorage._FileStorage__format = formats["json"]
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.count(), 2)
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__format,
+             FileStorage._FileStorage__journal,
+             FileStorage._FileStorage__file_stamp) = save
+            FileStorage._FileStorage__serialized.clear()
+            for path in ("test_format.json", "test_format.json.log",
+                         "test_format.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal(self):
+        """Test that journaled saves append to the log and replay on reload"""
+        storage = FileStorage()
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__journal,
+                FileStorage._FileStorage__compact_at,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__compact_at = 3
+        log = "test_journal.json.log"
+        try:
+            state = State(name="California")
+            city = City(name="Fremont")
+            storage.new(state)
+            storage.new(city)
+            storage.save()
+            self.assertFalse(os.path.exists(log))
+            state.name = "Nevada"
+            storage.delete(city)
+            storage.save()
+            with open(log, "r") as f:
+                self.assertEqual(len(f.readlines()), 2)
+            with open("test_journal.json", "r") as f:
+                self.assertIn("City." + city.id, json.load(f))
+
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(list(storage.all()), ["State." + state.id])
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+
+            storage.get(State, state.id).name = "Utah"
+            storage.save()
+            storage.new(City())
+            storage.save()
+            self.assertFalse(os.path.exists(log))
+            with open("test_journal.json", "r") as f:
+                self.assertEqual(len(json.load(f)), 2)
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__journal,
+             FileStorage._FileStorage__compact_at,
+             FileStorage._FileStorage__file_stamp) = save
+            for path in ("test_journal.json", log, "test_journal.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_torn(self):
+        """Test that a record cut short by a crash does not swallow the
+        records appended after it"""
+        storage = FileStorage()
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__journal,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_torn.json"
+        FileStorage._FileStorage__journal = True
+        log = "test_torn.json.log"
+        try:
+            storage.save()
+            states = [State(name=name) for name in ("a", "b", "c")]
+            for state in states[:2]:
+                storage.new(state)
+                storage.save()
+            with open(log, "ab") as f:
+                f.write(b'["State.torn", {"na')
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            storage.new(states[2])
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(sorted(obj.name for obj in
+                                    storage.all(State).values()),
+                             ["a", "b", "c"])
+            with open(log, "rb") as f:
+                self.assertEqual(len(f.readlines()), 3)
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__journal,
+             FileStorage._FileStorage__file_stamp) = save
+            for path in ("test_torn.json", log, "test_torn.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy(self):
+        """Test that lazy reload only builds objects when accessed"""
+        storage = FileStorage()
+        state = State(name="Île-de-France")
+        city = City(name="Paris", state_id=state.id)
+        amenity = Amenity(name="Wifi")
+        records = {"State." + state.id: state.to_dict(),
+                   "City." + city.id: city.to_dict(),
+                   "Amenity." + amenity.id: amenity.to_dict()}
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__lazy,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_lazy.json"
+        FileStorage._FileStorage__lazy = True
+        try:
+            with open("test_lazy.json", "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, indent=4)
+            storage.reload()
+            objects = FileStorage._FileStorage__objects
+            self.assertEqual(storage.count(), 3)
+            self.assertEqual(storage.count(City), 1)
+            for obj in objects.values():
+                self.assertIs(type(obj), file_storage.Unloaded)
+
+            new_state = storage.get(State, state.id)
+            self.assertIs(type(new_state), State)
+            self.assertEqual(new_state.name, "Île-de-France")
+            self.assertIs(objects["State." + state.id], new_state)
+            self.assertEqual([c.to_dict() for c in new_state.cities],
+                             [city.to_dict()])
+            self.assertIs(type(objects["Amenity." + amenity.id]),
+                          file_storage.Unloaded)
+
+            new_state.name = "Bretagne"
+            storage.save()
+            self.assertEqual(storage.get(Amenity, amenity.id).to_dict(),
+                             amenity.to_dict())
+            self.assertEqual(len(storage.all()), 3)
+            with open("test_lazy.json", "r") as f:
+                js = json.load(f)
+            self.assertEqual(js["State." + state.id]["name"], "Bretagne")
+            self.assertEqual(js["Amenity." + amenity.id], amenity.to_dict())
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__lazy,
+             FileStorage._FileStorage__file_stamp) = save
+            for path in ("test_lazy.json", "test_lazy.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close(self):
+        """Test that close only reloads the file as the policy says"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__reload_policy
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        try:
+            FileStorage._FileStorage__reload_policy = "on-change"
+            storage.close()
+            self.assertIs(storage.get(State, state.id), state)
+            with open(self.path, "r") as f:
+                js = json.load(f)
+            js["State." + state.id]["name"] = "Nevada"
+            with open(self.path, "w") as f:
+                json.dump(js, f)
+            FileStorage._FileStorage__reload_policy = "never"
+            storage.close()
+            self.assertIs(storage.get(State, state.id), state)
+            FileStorage._FileStorage__reload_policy = "on-change"
+            storage.close()
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+            state = storage.get(State, state.id)
+            FileStorage._FileStorage__reload_policy = "always"
+            storage.close()
+            self.assertIsNot(storage.get(State, state.id), state)
+        finally:
+            FileStorage._FileStorage__reload_policy = save
+            storage.delete(state)
+            storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_concurrent_save(self):
+        """Test that saving from many threads loses and corrupts nothing"""
+        storage = FileStorage()
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__journal,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__file_path = "test_threads.json"
+        keys = []
+        errors = []
+
+        def work():
+            """Creates and saves states while reading the store"""
+            try:
+                for i in range(25):
+                    state = State(name=str(i))
+                    storage.new(state)
+                    storage.save()
+                    keys.append("State." + state.id)
+                    state.name = "Nevada"
+                    self.assertIn(keys[-1], storage.all(State))
+                    storage.save()
+            except Exception as e:
+                errors.append(e)
+        try:
+            for journal in (False, True):
+                with self.subTest(journal=journal):
+                    FileStorage._FileStorage__objects = {}
+                    FileStorage._FileStorage__journal = journal
+                    keys.clear()
+                    threads = [threading.Thread(target=work)
+                               for i in range(8)]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    self.assertEqual(errors, [])
+                    if not journal:
+                        with open("test_threads.json", "r") as f:
+                            self.assertEqual(sorted(json.load(f)),
+                                             sorted(keys))
+                    FileStorage._FileStorage__objects = {}
+                    storage.reload()
+                    self.assertEqual(sorted(storage.all()), sorted(keys))
+                    self.assertEqual({obj.name for obj in
+                                      storage.all().values()}, {"Nevada"})
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__journal,
+             FileStorage._FileStorage__file_stamp) = save
+            for path in ("test_threads.json", "test_threads.json.log",
+                         "test_threads.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(file_storage.fcntl is None, "fcntl is not available")
+    def test_concurrent_processes(self):
+        """Test that processes sharing the file keep each other's objects"""
+        code = "\n".join([
+            "import models, sys",
+            "from models.engine.file_storage import FileStorage",
+            "from models.state import State",
+            "FileStorage._FileStorage__objects = {}",
+            "FileStorage._FileStorage__file_path = sys.argv[1]",
+            "FileStorage._FileStorage__journal = sys.argv[2] == 'True'",
+            "models.storage.reload()",
+            "for i in range(20):",
+            "    state = State(name=str(i))",
+            "    state.save()",
+            "    print('State.' + state.id)"])
+        storage = FileStorage()
+        save = (FileStorage._FileStorage__objects,
+                FileStorage._FileStorage__file_path,
+                FileStorage._FileStorage__file_stamp)
+        FileStorage._FileStorage__file_path = "test_processes.json"
+        try:
+            for journal in (False, True):
+                with self.subTest(journal=journal):
+                    workers = [subprocess.Popen(
+                        [sys.executable, "-c", code, "test_processes.json",
+                         str(journal)], stdout=subprocess.PIPE,
+                        universal_newlines=True) for i in range(4)]
+                    keys = []
+                    for worker in workers:
+                        keys.extend(worker.communicate()[0].split())
+                        self.assertEqual(worker.returncode, 0)
+                    FileStorage._FileStorage__objects = {}
+                    storage.reload()
+                    self.assertEqual(len(keys), 80)
+                    self.assertEqual(sorted(storage.all()), sorted(keys))
+                    for path in ("test_processes.json",
+                                 "test_processes.json.log"):
+                        if os.path.exists(path):
+                            os.remove(path)
+        finally:
+            (FileStorage._FileStorage__objects,
+             FileStorage._FileStorage__file_path,
+             FileStorage._FileStorage__file_stamp) = save
+            for path in ("test_processes.json", "test_processes.json.log",
+                         "test_processes.json.lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_uses_index(self):
+        """Test that all(cls) and count(cls) do not scan the whole store"""
+
+        class Unscannable(dict):
+            """Objects dictionary that fails once scanning is forbidden"""
+            frozen = False
+
+            def scan(self, method):
+                """Fails if frozen, else calls the dict method"""
+                if self.frozen:
+                    raise AssertionError("__objects was scanned")
+                return getattr(dict, method)(self)
+
+            def __iter__(self):
+                """Fails if frozen, else dict.__iter__"""
+                return self.scan("__iter__")
+
+            def items(self):
+                """Fails if frozen, else dict.items"""
+                return self.scan("items")
+
+            def values(self):
+                """Fails if frozen, else dict.values"""
+                return self.scan("values")
+
+            def keys(self):
+                """Fails if frozen, else dict.keys"""
+                return self.scan("keys")
+
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        objects = Unscannable()
+        FileStorage._FileStorage__objects = objects
+        try:
+            for i in range(1000):
+                obj = BaseModel.__new__(BaseModel)
+                obj.__dict__["id"] = str(i)
+                storage.new(obj)
+            amenities = [Amenity() for i in range(50)]
+            for amenity in amenities:
+                storage.new(amenity)
+            objects.frozen = True
+            indexed = storage.all(Amenity)
+            count = storage.count(Amenity)
+            objects.frozen = False
+        finally:
+            FileStorage._FileStorage__objects = save
+        self.assertEqual(indexed, {"Amenity." + amenity.id: amenity
+                                   for amenity in amenities})
+        self.assertEqual(count, 50)
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs and TestSerializers classes
+"""
+
+import inspect
+import io
+import json
+from models.engine import serializers
+import pep8
+import unittest
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the serializers"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = inspect.getmembers(serializers, inspect.isfunction)
+        for name, cls_ in inspect.getmembers(serializers, inspect.isclass):
+            cls.funcs += inspect.getmembers(cls_, inspect.isfunction)
+
+    def test_pep8_conformance_serializers(self):
+        """Test that models/engine/serializers.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_serializers(self):
+        """Test tests/test_models/test_engine/test_serializers.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_module_docstring(self):
+        """Test for the serializers.py module docstring"""
+        self.assertIsNot(serializers.__doc__, None,
+                         "serializers.py needs a docstring")
+        self.assertTrue(len(serializers.__doc__) >= 1,
+                        "serializers.py needs a docstring")
+
+    def test_serializers_func_docstrings(self):
+        """Test for the presence of docstrings in serializers functions"""
+        for func in self.funcs:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the serializers"""
+    items = {"State.{}".format(i): {"name": "é" * i, "number": i * 1000}
+             for i in range(50)}
+
+    def test_iter_json_items(self):
+        """Test that the JSON file is read one record at a time"""
+        for indent in (None, 2):
+            f = io.StringIO(json.dumps(self.items, indent=indent))
+            items = serializers.iter_json_items(f, chunk_size=7)
+            self.assertEqual(next(items), ("State.0", self.items["State.0"]))
+            self.assertLess(f.tell(), 100)
+            self.assertEqual(dict(items), dict(list(self.items.items())[1:]))
+        numbers = {"a": 12.5e3, "b": -1, "c": -0.25, "d": 1.5e10,
+                   "e": -3E-7, "f": 0, "g": [1.25, -2e+2], "h": 2}
+        for size in range(1, 9):
+            for text in (json.dumps(numbers), json.dumps(numbers, indent=1),
+                         '{"a": 12.5e3,"b":1.5E+10 ,"c":-7}'):
+                self.assertEqual(
+                    dict(serializers.iter_json_items(io.StringIO(text),
+                                                     size)),
+                    json.loads(text))
+        for text in ("", "{", '{"a": 1', '{"a": 1,}', "[1]", '{"a": 1.}'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(serializers.iter_json_items(io.StringIO(text), 2))
+
+    def test_round_trip(self):
+        """Test that every serializer reads back the file it writes"""
+        for name, fmt in serializers.serializers.items():
+            with self.subTest(name=name):
+                data = fmt.head(len(self.items))
+                spans = {}
+                for i, (key, value) in enumerate(self.items.items()):
+                    data += fmt.item(i, key)
+                    spans[key] = len(data)
+                    data += fmt.dumps(value)
+                data += fmt.tail()
+                f = io.BytesIO(data)
+                self.assertIs(serializers.detect(f, fmt), fmt)
+                self.assertEqual(dict(fmt.iter_items(f)), self.items)
+                f.seek(0)
+                for key, value, start, end in fmt.iter_items(f, True):
+                    self.assertEqual(fmt.loads(data[start:end]),
+                                     self.items[key])
+                    self.assertLessEqual(start, spans[key])
+
+    def test_log(self):
+        """Test that every serializer reads back the log it writes"""
+        for name, fmt in serializers.serializers.items():
+            with self.subTest(name=name):
+                first = fmt.log_record("State.1", fmt.dumps({"a": 1}))
+                data = first + fmt.log_record("State.2", fmt.dumps(None))
+                torn = fmt.log_record("State.3", fmt.dumps({"a": 3}))
+                f = io.BytesIO(data + torn[:-2])
+                self.assertEqual(list(fmt.iter_log(f)),
+                                 [("State.1", {"a": 1}), ("State.2", None)])
+                f.seek(0)
+                self.assertEqual([end for key, record, end in
+                                  fmt.iter_log(f, offsets=True)],
+                                 [len(first), len(data)])
+
+    def test_get_serializer(self):
+        """Test that unknown or missing formats fall back to json"""
+        self.assertIs(serializers.get_serializer("json"),
+                      serializers.serializers["json"])
+        self.assertIs(serializers.get_serializer("yaml"),
+                      serializers.serializers["json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+Contains the TestSortedIndexDocs and TestSortedIndex classes
+"""
+
+import inspect
+from models.engine import sorted_index
+from models.engine.sorted_index import SortedIndex
+import pep8
+import unittest
+
+
+class TestSortedIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SortedIndex"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.funcs = inspect.getmembers(SortedIndex, inspect.isfunction)
+
+    def test_pep8_conformance_sorted_index(self):
+        """Test that models/engine/sorted_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sorted_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sorted_index(self):
+        """Test tests/test_models/test_engine/test_sorted_index.py PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sorted_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sorted_index_module_docstring(self):
+        """Test for the sorted_index.py module docstring"""
+        self.assertIsNot(sorted_index.__doc__, None,
+                         "sorted_index.py needs a docstring")
+        self.assertTrue(len(sorted_index.__doc__) >= 1,
+                        "sorted_index.py needs a docstring")
+
+    def test_sorted_index_class_docstring(self):
+        """Test for the SortedIndex class docstring"""
+        self.assertIsNot(SortedIndex.__doc__, None,
+                         "SortedIndex class needs a docstring")
+        self.assertTrue(len(SortedIndex.__doc__) >= 1,
+                        "SortedIndex class needs a docstring")
+
+    def test_sorted_index_func_docstrings(self):
+        """Test for the presence of docstrings in SortedIndex methods"""
+        for func in self.funcs:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+    def test_order(self):
+        """Test that keys come out in the order of their sort keys"""
+        index = SortedIndex()
+        for key, sort_key in [("b", 2), ("a", 2), ("c", 1), ("d", 3)]:
+            index.add(key, sort_key)
+        self.assertEqual(list(index), ["c", "a", "b", "d"])
+        self.assertEqual(len(index), 4)
+        self.assertIn("a", index)
+        self.assertEqual(index.sort_key("d"), 3)
+
+    def test_move_and_remove(self):
+        """Test that keys added again move and removed keys are gone"""
+        index = SortedIndex()
+        for i in range(10):
+            index.add(i, i)
+        index.add(0, 20)
+        index.remove(5)
+        index.remove("missing")
+        self.assertEqual(list(index), [1, 2, 3, 4, 6, 7, 8, 9, 0])
+        self.assertNotIn(5, index)
+        index.add(5, 5)
+        self.assertEqual(list(index), [1, 2, 3, 4, 5, 6, 7, 8, 9, 0])
+        index.add(3, 3)
+        self.assertIsNotNone(index._SortedIndex__entries)
+        self.assertEqual(index._SortedIndex__stale, set())
+
+    def test_iter_from(self):
+        """Test that iter_from starts past the pair it is given"""
+        index = SortedIndex()
+        for i in range(10):
+            index.add(str(i), i // 2)
+        self.assertEqual(list(index.iter_from((2, "4"))),
+                         ["5", "6", "7", "8", "9"])
+        self.assertEqual(list(index.iter_from((2, "3"))),
+                         ["4", "5", "6", "7", "8", "9"])
+        self.assertEqual(list(index.iter_from((9, ""))), [])
+
+    def test_changed_during_iteration(self):
+        """Test that a change that reorders the index stops iterations"""
+        index = SortedIndex()
+        for i in range(3):
+            index.add(i, i)
+        keys = iter(index)
+        next(keys)
+        index.add(0, 10)
+        self.assertEqual(list(keys), [1, 2])
+        index.add(1, -1)
+        keys = iter(index)
+        next(keys)
+        index.add(2, -2)
+        with self.assertRaises(RuntimeError):
+            next(keys)
@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
 import pep8
 import unittest
@@ -171,6 +172,20 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenities(self):
+        """Test that amenities follows amenity_ids"""
+        place = Place()
+        amenity = Amenity()
+        models.storage.new(amenity)
+        place.amenities = amenity
+        place.amenities = amenity
+        self.assertEqual(place.amenity_ids, [amenity.id])
+        self.assertEqual(place.amenities, [amenity])
+        self.assertEqual(Place().amenity_ids, [])
+        models.storage.delete(amenity)
+        self.assertEqual(place.amenities, [])
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()
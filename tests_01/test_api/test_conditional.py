@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditional class
+"""
+
+from api.v1.app import app
+import models
+from models.engine.file_storage import FileStorage
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestConditional(unittest.TestCase):
+    """Test the ETag, Last-Modified and 304 Not Modified of the API"""
+    def setUp(self):
+        """Points FileStorage at a copy of its file in a directory of its
+        own, so the tests leave file.json as it is"""
+        self.client = app.test_client()
+        self.file_path = FileStorage._FileStorage__file_path
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, "file.json")
+        if models.storage_t != 'db' and os.path.exists(self.file_path):
+            shutil.copy(self.file_path, path)
+        FileStorage._FileStorage__file_path = path
+        response = self.client.post('/api/v1/states',
+                                    json={"name": "California"})
+        self.url = '/api/v1/states/' + response.get_json()["id"]
+
+    def tearDown(self):
+        """Deletes the state and points FileStorage back at its file"""
+        self.client.delete(self.url)
+        FileStorage._FileStorage__file_path = self.file_path
+        shutil.rmtree(self.dir)
+
+    def test_not_modified(self):
+        """Test that If-None-Match with the ETag answers 304 without a body,
+        and with another ETag the object"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        tag = response.get_etag()[0]
+        self.assertIsNotNone(tag)
+        self.assertIsNotNone(response.last_modified)
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"' + tag + '"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.get_etag()[0], tag)
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "California")
+
+    def test_etag_changes(self):
+        """Test that a PUT gives the object a new ETag, at once, so the old
+        one no longer answers 304"""
+        tag = self.client.get(self.url).get_etag()[0]
+        for name in ("Nevada", "Utah"):
+            response = self.client.put(self.url, json={"name": name})
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(
+                self.url, headers={"If-None-Match": '"' + tag + '"'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["name"], name)
+            self.assertNotEqual(response.get_etag()[0], tag)
+            tag = response.get_etag()[0]
+
+    def test_missing(self):
+        """Test that an unknown id answers 404 whatever the headers"""
+        response = self.client.get('/api/v1/states/missing',
+                                   headers={"If-None-Match": "*"})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagination class
+"""
+
+from api.v1.app import app
+import base64
+import json
+import models
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestPagination(unittest.TestCase):
+    """Test the limit and cursor of the list endpoints"""
+    def setUp(self):
+        """Points FileStorage at a copy of its file in a directory of its
+        own, so the tests leave file.json as it is, and stores a city with
+        places"""
+        self.client = app.test_client()
+        self.file_path = FileStorage._FileStorage__file_path
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, "file.json")
+        if models.storage_t != 'db' and os.path.exists(self.file_path):
+            shutil.copy(self.file_path, path)
+        FileStorage._FileStorage__file_path = path
+        self.state = State(name="California")
+        self.city = City(name="San Francisco", state_id=self.state.id)
+        self.user = User(email="pages@hbnb.io", password="pwd")
+        for obj in (self.state, self.city, self.user):
+            models.storage.new(obj)
+        self.add_places(5)
+        self.url = '/api/v1/cities/{}/places'.format(self.city.id)
+
+    def tearDown(self):
+        """Deletes what the test stored and points FileStorage back at its
+        file"""
+        for obj in models.storage.all(Place).values():
+            if obj.city_id == self.city.id:
+                models.storage.delete(obj)
+        for cls, obj in ((City, self.city), (State, self.state),
+                         (User, self.user)):
+            obj = models.storage.get(cls, obj.id)
+            if obj is not None:
+                models.storage.delete(obj)
+        models.storage.save()
+        models.storage.close()
+        FileStorage._FileStorage__file_path = self.file_path
+        shutil.rmtree(self.dir)
+
+    def add_places(self, count):
+        """Stores count places in the city, and saves"""
+        models.storage.bulk_new([
+            Place(city_id=self.city.id, user_id=self.user.id,
+                  name="Place {}".format(i)) for i in range(count)])
+
+    def ordered_ids(self):
+        """Returns the ids of the places of the city in the order they are
+        listed in: by created_at, then id"""
+        return [place.id for place in sorted(
+            (place for place in models.storage.all(Place).values()
+             if place.city_id == self.city.id),
+            key=lambda place: (place.created_at, place.id))]
+
+    def test_pages(self):
+        """Test that following the Link header lists every place once, in
+        order, limit at a time"""
+        url = self.url + '?limit=2'
+        pages = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([place["id"] for place in response.get_json()])
+            link = response.headers.get("Link")
+            url = None
+            if link is not None:
+                self.assertTrue(link.endswith('>; rel="next"'))
+                url = link[1:link.index(">")]
+                self.assertIn("limit=2", url)
+                self.assertIn("cursor=", url)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.ordered_ids())
+        response = self.client.get(self.url + '?limit=5')
+        self.assertNotIn("Link", response.headers)
+        self.assertEqual(len(response.get_json()), 5)
+
+    def test_fields(self):
+        """Test that fields keeps only the keys asked for, on every page"""
+        response = self.client.get(self.url + '?limit=3&fields=id,name')
+        self.assertEqual(set(response.get_json()[0]), {"id", "name"})
+        self.assertIn("fields=id%2Cname", response.headers["Link"])
+
+    def test_invalid(self):
+        """Test that a bad limit or cursor answers 400"""
+        for limit in ("0", "-1", "abc", ""):
+            response = self.client.get(self.url + '?limit=' + limit)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(), {"error": "Invalid limit"})
+        for cursor in ("abc", "!!", base64.urlsafe_b64encode(b'[1, 2]'),
+                       base64.urlsafe_b64encode(b'["x", "id"]'),
+                       base64.urlsafe_b64encode(b'{"a": 1}')):
+            if isinstance(cursor, bytes):
+                cursor = cursor.decode()
+            response = self.client.get(self.url + '?cursor=' + cursor)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(),
+                             {"error": "Invalid cursor"})
+
+    def test_stream(self):
+        """Test that the list streamed without a limit, 1000 places at a
+        time, is what jsonify makes of the whole list, compact or not"""
+        self.add_places(2500)
+        compact = app.json.compact
+        try:
+            for app.json.compact in (True, False):
+                response = self.client.get(self.url, buffered=False)
+                try:
+                    chunks = [chunk if isinstance(chunk, bytes) else
+                              chunk.encode() for chunk in response.response]
+                finally:
+                    response.close()
+                # three chunks of places, then the end of the list
+                self.assertEqual(len(chunks), 4)
+                streamed = b"".join(chunks)
+                whole = self.client.get(self.url + '?limit=3000').data
+                self.assertEqual(json.loads(streamed), json.loads(whole))
+                self.assertEqual(streamed, whole)
+                self.assertEqual([place["id"] for place in
+                                  json.loads(streamed)], self.ordered_ids())
+        finally:
+            app.json.compact = compact
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesBatch class
+"""
+
+from api.v1.app import app
+import models
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestPlacesBatch(unittest.TestCase):
+    """Test the POST, PUT and DELETE /api/v1/places/batch endpoints"""
+    def setUp(self):
+        """Points FileStorage at a copy of its file in a directory of its
+        own, so the tests leave file.json as it is, and stores the city and
+        the user of the places"""
+        self.client = app.test_client()
+        self.file_path = FileStorage._FileStorage__file_path
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, "file.json")
+        if models.storage_t != 'db' and os.path.exists(self.file_path):
+            shutil.copy(self.file_path, path)
+        FileStorage._FileStorage__file_path = path
+        self.state = State(name="California")
+        self.city = City(name="San Francisco", state_id=self.state.id)
+        self.user = User(email="batch@hbnb.io", password="pwd")
+        for obj in (self.state, self.city, self.user):
+            models.storage.new(obj)
+        models.storage.save()
+
+    def tearDown(self):
+        """Deletes what the test stored and points FileStorage back at its
+        file"""
+        for obj in models.storage.all(Place).values():
+            if obj.city_id == self.city.id:
+                models.storage.delete(obj)
+        for cls, obj in ((City, self.city), (State, self.state),
+                         (User, self.user)):
+            obj = models.storage.get(cls, obj.id)
+            if obj is not None:
+                models.storage.delete(obj)
+        models.storage.save()
+        models.storage.close()
+        FileStorage._FileStorage__file_path = self.file_path
+        shutil.rmtree(self.dir)
+
+    def place(self, name, **kwargs):
+        """Returns the JSON of a place of the city and the user"""
+        data = {"city_id": self.city.id, "user_id": self.user.id,
+                "name": name}
+        data.update(kwargs)
+        return data
+
+    def listed(self):
+        """Returns the names of the places the API lists in the city"""
+        response = self.client.get(
+            '/api/v1/cities/{}/places'.format(self.city.id))
+        return sorted(place["name"] for place in response.get_json())
+
+    def test_batch(self):
+        """Test that a batch of places is created, updated and deleted"""
+        response = self.client.post('/api/v1/places/batch', json=[
+            self.place("Loft", number_rooms=2), self.place("Cabin")])
+        self.assertEqual(response.status_code, 201)
+        places = response.get_json()
+        self.assertEqual([place["name"] for place in places],
+                         ["Loft", "Cabin"])
+        self.assertEqual(places[0]["number_rooms"], 2)
+        self.assertEqual(self.listed(), ["Cabin", "Loft"])
+        ids = [place["id"] for place in places]
+        response = self.client.put('/api/v1/places/batch', json=[
+            {"id": ids[0], "name": "Attic", "city_id": "elsewhere"},
+            {"id": ids[1], "max_guest": 4}])
+        self.assertEqual(response.status_code, 200)
+        places = response.get_json()
+        self.assertEqual([place["name"] for place in places],
+                         ["Attic", "Cabin"])
+        self.assertEqual(places[0]["city_id"], self.city.id)
+        self.assertEqual(places[1]["max_guest"], 4)
+        self.assertEqual(self.listed(), ["Attic", "Cabin"])
+        response = self.client.delete('/api/v1/places/batch', json=ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.listed(), [])
+        for id in ids:
+            self.assertEqual(
+                self.client.get('/api/v1/places/' + id).status_code, 404)
+
+    def test_create_all_or_nothing(self):
+        """Test that one bad place fails the whole batch, storing none"""
+        for places, status, error in (
+                ([self.place("Loft"), {"city_id": self.city.id,
+                                       "user_id": self.user.id}],
+                 400, {"error": "Missing name", "index": 1}),
+                ([self.place("Loft"), self.place("Cabin", user_id=1)],
+                 400, {"error": "Missing user_id", "index": 1}),
+                ([self.place("Loft"), self.place("Cabin",
+                                                 city_id="missing")],
+                 404, {"error": "Not found"}),
+                ({"name": "Loft"}, 400, {"error": "Not a JSON list"}),
+                ([self.place("Loft"), "Cabin"],
+                 400, {"error": "Not a JSON list"})):
+            response = self.client.post('/api/v1/places/batch',
+                                        json=places)
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(response.get_json(), error)
+            self.assertEqual(self.listed(), [])
+
+    def test_update_delete_all_or_nothing(self):
+        """Test that one unknown or bad place fails the whole update or
+        deletion, changing none"""
+        ids = [place["id"] for place in self.client.post(
+            '/api/v1/places/batch', json=[
+                self.place("Loft"), self.place("Cabin")]).get_json()]
+        for places, status in (
+                ([{"id": ids[0], "name": "Attic"}, {"name": "Barn"}], 400),
+                ([{"id": ids[0], "name": "Attic"},
+                  {"id": "missing", "name": "Barn"}], 404)):
+            response = self.client.put('/api/v1/places/batch', json=places)
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(self.listed(), ["Cabin", "Loft"])
+        for body, status in (([ids[0], "missing"], 404), (ids[0], 400)):
+            response = self.client.delete('/api/v1/places/batch', json=body)
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(self.listed(), ["Cabin", "Loft"])
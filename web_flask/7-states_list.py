@@ -6,13 +6,15 @@ starts a Flask web application
 from flask import Flask, render_template
 from models import *
 from models import storage
+from web_flask.page_cache import cached_page
 app = Flask(__name__)
 
 
 @app.route('/states_list', strict_slashes=False)
+@cached_page("State")
 def states_list():
     """display a HTML page with the states listed in alphabetical order"""
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
+    states = storage.all_sorted("State", "name")
     return render_template('7-states_list.html', states=states)
 
 
@@ -6,14 +6,20 @@ starts a Flask web application
 from flask import Flask, render_template
 from models import *
 from models import storage
+from web_flask.page_cache import cached_page
 app = Flask(__name__)
 
 
 @app.route('/cities_by_states', strict_slashes=False)
+@cached_page("State", "City")
 def cities_by_states():
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State").values()
-    return render_template('8-cities_by_states.html', states=states)
+    states = storage.all_sorted("State", "name")
+    cities = {}
+    for city in storage.all_sorted("City", "name"):
+        cities.setdefault(city.state_id, []).append(city)
+    return render_template('8-cities_by_states.html', states=states,
+                           cities=cities)
 
 
 @app.teardown_appcontext
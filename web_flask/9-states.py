@@ -6,17 +6,26 @@ starts a Flask web application
 from flask import Flask, render_template
 from models import *
 from models import storage
+from models.state import State
+from web_flask.page_cache import cached_page
 app = Flask(__name__)
 
 
 @app.route('/states', strict_slashes=False)
 @app.route('/states/<state_id>', strict_slashes=False)
+@cached_page("State", "City")
 def states(state_id=None):
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State")
-    if state_id is not None:
-        state_id = 'State.' + state_id
-    return render_template('9-states.html', states=states, state_id=state_id)
+    if state_id is None:
+        return render_template('9-states.html',
+                               states=storage.all_sorted("State", "name"))
+    state = storage.get(State, state_id)
+    cities = []
+    if state is not None:
+        cities = storage.all_sorted("City", "name", attr="state_id",
+                                    parent_id=state_id)
+    return render_template('9-states.html', state=state, cities=cities,
+                           state_id=state_id)
 
 
 @app.teardown_appcontext
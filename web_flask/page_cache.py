@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+Contains the cache the web_flask apps keep their rendered pages in
+"""
+
+from collections import OrderedDict
+import functools
+import threading
+from models import storage
+
+
+def cached_page(*clss, max_pages=256):
+    """Decorates a view so the page it renders for each set of arguments is
+    kept in memory, up to max_pages of them, and served again until
+    storage.generation() says objects of clss changed"""
+    def decorator(view):
+        """Returns view, caching its pages"""
+        # OrderedDict - view arguments -> page, least recently used first
+        pages = OrderedDict()
+        # the storage generation pages were rendered at
+        rendered_at = [None]
+        lock = threading.Lock()
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            """Returns the cached page, rendering it if it is not there"""
+            key = (args, tuple(sorted(kwargs.items())))
+            generation = storage.generation(*clss)
+            with lock:
+                if rendered_at[0] != generation:
+                    pages.clear()
+                    rendered_at[0] = generation
+                elif key in pages:
+                    pages.move_to_end(key)
+                    return pages[key]
+            page = view(*args, **kwargs)
+            with lock:
+                if rendered_at[0] == generation:
+                    pages[key] = page
+                    while len(pages) > max_pages:
+                        pages.popitem(last=False)
+            return page
+        wrapper.cache_clear = pages.clear
+        return wrapper
+    return decorator